@@ -1,34 +1,109 @@
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import os
-from dotenv import load_dotenv
-from groq import Groq
-import uvicorn
-from typing import List, Dict
+import json
+import asyncio
+from pydantic import BaseModel
+from typing import List, Dict, Optional
 import sys
 import re
-from datetime import datetime
+import logging
+import time
 sys.path.append('..')
+from groq_clients import close_all_clients, get_async_groq_client, load_env
 from humanize_using_groq import HumanizeTextWithGroq
+from groq_scheduler import estimate_tokens, get_scheduler
+from chat_store import ChatSessionStore, create_chat_store
+from chat_context import ChatContextManager, count_message_tokens, create_context_manager
+from job_queue import FINISHED_STATES, HumanizeJobQueue, create_job_queue
+from humanize_algorithm.naive_replace import naive_humanize
+from humanize_algorithm.phrase_detector import get_default_detector
+from text_segmenter import SegmentedText
+from model_limits import MODEL_LIMITS, is_supported_model
+from log_config import configure_logging, get_logger
+from metrics import HTTP_REQUEST_SECONDS, REGISTRY
 
-load_dotenv()
+logger = get_logger("backend")
 
 app = FastAPI(title="Humanizer", description="AI Text Humanization Tool")
 
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
 templates = Jinja2Templates(directory="frontend/templates")
 
-# Initialize Groq client with proper error handling
-groq_api_key = os.getenv("GROQ_API_KEY")
-if not groq_api_key:
-    raise ValueError("GROQ_API_KEY environment variable is required")
+# Settings below are read when used, after the startup hook has loaded .env
 
-client = Groq(api_key=groq_api_key)
+def max_batch_documents() -> int:
+    """Largest number of documents accepted by the batch endpoint (HUMANIZER_MAX_BATCH_DOCUMENTS)."""
+    return int(os.getenv("HUMANIZER_MAX_BATCH_DOCUMENTS", "1000"))
 
-# In-memory storage for chat conversations (in production, use a database)
-chat_sessions: Dict[str, List[Dict[str, str]]] = {}
+def batch_max_concurrency() -> int:
+    """Chunks of one batch humanized in parallel at most (HUMANIZER_BATCH_CONCURRENCY)."""
+    return int(os.getenv("HUMANIZER_BATCH_CONCURRENCY", "16"))
+
+CHAT_SYSTEM_PROMPT = "You are a helpful AI assistant. Provide clear, concise, and helpful responses."
+CHAT_MAX_TOKENS = 4000
+
+# Bounded chat session storage (in-process by default, SQLite when CHAT_STORE_BACKEND=sqlite)
+_chat_sessions: Optional[ChatSessionStore] = None
+
+# Keeps each chat prompt within a token budget so per-turn latency stays flat
+_chat_context: Optional[ChatContextManager] = None
+
+def get_chat_sessions() -> ChatSessionStore:
+    """Create the chat session store on first use."""
+    global _chat_sessions
+    if _chat_sessions is None:
+        _chat_sessions = create_chat_store(CHAT_SYSTEM_PROMPT)
+    return _chat_sessions
+
+def get_chat_context() -> ChatContextManager:
+    """Create the chat context manager on first use."""
+    global _chat_context
+    if _chat_context is None:
+        _chat_context = create_context_manager()
+    return _chat_context
+
+def metrics_dir() -> Optional[str]:
+    """Directory where each worker writes its metrics so /metrics can add them up (see run.py --production)."""
+    return os.getenv("HUMANIZER_METRICS_DIR") or None
+
+_metrics_flusher: Optional[asyncio.Task] = None
+
+async def flush_metrics_periodically(directory: str, interval: float):
+    """Write this worker's metrics snapshot to a directory every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(REGISTRY.write_snapshot, directory)
+        except OSError as e:
+            logger.warning("Could not write the metrics snapshot: %s", e)
+
+# Background humanization jobs, checkpointed per chunk in SQLite (created on startup or first use)
+_humanize_jobs: Optional[HumanizeJobQueue] = None
+
+async def get_job_queue() -> HumanizeJobQueue:
+    """Create and start the background job queue on first use."""
+    global _humanize_jobs
+    if _humanize_jobs is None:
+        _humanize_jobs = create_job_queue()
+        await _humanize_jobs.start()
+    return _humanize_jobs
+
+def unsupported_model_error(model: str) -> Optional[Dict]:
+    """
+    Reject models the app does not serve.
+    
+    Args:
+        model: Model name from the request
+        
+    Returns:
+        Error payload, or None if the model is supported
+    """
+    if is_supported_model(model):
+        return None
+    return {"success": False, "error": f"Unsupported model. Choose one of: {', '.join(MODEL_LIMITS)}."}
 
 def sanitize_unicode_text(text: str) -> str:
     """
@@ -56,20 +131,115 @@ def sanitize_unicode_text(text: str) -> str:
     
     return sanitized
 
+@app.on_event("startup")
+async def startup():
+    global _metrics_flusher
+    # Read .env once (variables already set win), then apply its logging settings
+    load_env()
+    configure_logging()
+    # Groq clients are created on first use, so only warn here instead of refusing to start
+    if not os.getenv("GROQ_API_KEY"):
+        logger.warning("GROQ_API_KEY is not set; requests that call Groq will fail")
+    # Picks up jobs left unfinished by a previous run
+    await get_job_queue()
+    if metrics_dir():
+        _metrics_flusher = asyncio.create_task(
+            flush_metrics_periodically(metrics_dir(), float(os.getenv("HUMANIZER_METRICS_FLUSH", "5"))))
+
+@app.on_event("shutdown")
+async def shutdown():
+    if _humanize_jobs is not None:
+        await _humanize_jobs.stop()
+    if _metrics_flusher is not None:
+        _metrics_flusher.cancel()
+        # Keep this worker's final counts in the aggregate
+        await asyncio.to_thread(REGISTRY.write_snapshot, metrics_dir())
+    # Release pooled upstream connections
+    await close_all_clients()
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by the matched route's template (e.g. /jobs/{job_id}), so URLs can't create unbounded series
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        # The static files mount does not set a route
+        path = "/static" if request.url.path.startswith("/static/") else "other"
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, path=path, status=response.status_code)
+    return response
+
+@app.get("/metrics")
+async def metrics():
+    """Expose request, pipeline and Groq metrics in the Prometheus text format (summed over workers when metrics_dir() is set)."""
+    directory = metrics_dir()
+    body = await asyncio.to_thread(REGISTRY.render, directory) if directory else REGISTRY.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+def quality_report(original: str, result: str) -> Dict:
+    """
+    Compare a humanized text with its input (readability, drift, AI phrases).
+    
+    Args:
+        original: Sanitized input text
+        result: Humanized text
+        
+    Returns:
+        Quality report from text_metrics.quality_reports
+    """
+    # Imported on first use so workers do not load numpy at startup
+    from text_metrics import quality_reports
+    return quality_reports([original], [result])[0]
+
+def humanize_naive(text: str) -> Dict:
+    """
+    Humanize text with the local phrase-replacement engine (no Groq calls).
+    
+    Args:
+        text: Sanitized text to humanize
+        
+    Returns:
+        Response payload for the naive_replace mode
+    """
+    result, num_replacements, replacements = naive_humanize(text)
+    result = sanitize_unicode_text(result)
+    
+    logger.info("Naive humanization replaced %d phrases", num_replacements,
+                extra={"mode": "naive_replace", "input_chars": len(text)})
+    
+    return {"success": True, "result": result, "replacements": num_replacements,
+            "quality": quality_report(text, result)}
+
 @app.post("/humanize")
 async def humanize_text(
     prompt: str = Form(...),
     mode: str = Form(...),
     model: str = Form(default="llama-3.3-70b-versatile"),
     iterations: int = Form(default=2),
-    ai_response: str = Form(default="")
+    ai_response: str = Form(default=""),
+    naive_prepass: bool = Form(default=False),
+    converge: bool = Form(default=False),
+    include_metrics: bool = Form(default=False)
 ):
     try:
-        if mode == "llm_approach":
+        model_error = unsupported_model_error(model)
+        if model_error:
+            return model_error
+        
+        if mode == "naive_replace":
+            text_to_humanize = ai_response if ai_response.strip() else prompt
+            
+            if not text_to_humanize.strip():
+                return {"success": False, "error": "No text available to humanize. Please generate content first."}
+            
+            return await asyncio.to_thread(humanize_naive, sanitize_unicode_text(text_to_humanize))
+        
+        elif mode == "llm_approach":
             # Use the HumanizeTextWithGroq class with the selected model
             text_to_humanize = ai_response if ai_response.strip() else prompt
             
@@ -80,34 +250,37 @@ async def humanize_text(
             text_to_humanize = sanitize_unicode_text(text_to_humanize)
             
             # Log humanization request start
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            word_count = len(text_to_humanize.split())
-            print(f"\n[{timestamp}] 📨 HUMANIZATION REQUEST RECEIVED")
-            print(f"[{timestamp}] 🎯 Model: {model}")
-            print(f"[{timestamp}] 🔄 Iterations: {iterations}")
-            print(f"[{timestamp}] 📝 Input text: {word_count} words")
-            print(f"[{timestamp}] 🔧 Mode: {mode}")
+            logger.info(
+                "Humanization request received",
+                extra={"model": model, "iterations": iterations, "mode": mode, "naive_prepass": naive_prepass,
+                       "converge": converge, "input_chars": len(text_to_humanize)}
+            )
             
-            # Initialize the humanizer with the selected model
-            humanizer = HumanizeTextWithGroq(api_key=groq_api_key, model=model)
+            # Initialize the humanizer with the selected model (reuses the pooled client)
+            humanizer = HumanizeTextWithGroq(model=model, naive_prepass=naive_prepass, converge=converge)
             
             # Validate iterations range (1-5)
             iterations = max(1, min(iterations, 5))
             
             # Humanize the text with user-specified iterations
-            result = humanizer.humanize_text(text_to_humanize, n_iterations=iterations)
+            result = await humanizer.ahumanize_text(text_to_humanize, n_iterations=iterations)
             
             # Sanitize output text to prevent Unicode encoding errors
             result = sanitize_unicode_text(result)
             
             # Log completion
-            result_word_count = len(result.split())
-            final_timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[{final_timestamp}] ✅ HUMANIZATION REQUEST COMPLETED")
-            print(f"[{final_timestamp}] 📤 Output: {result_word_count} words")
-            print(f"[{final_timestamp}] 📊 Word count change: {result_word_count - word_count:+d} words")
+            fallbacks = humanizer.get_fallbacks()
+            logger.info(
+                "Humanization request completed",
+                extra={"model": model, "output_chars": len(result),
+                       "cache_hit_rate": round(humanizer.get_cache_stats()["hit_rate"], 2), "fallbacks": len(fallbacks)}
+            )
             
-            return {"success": True, "result": result}
+            response = {"success": True, "result": result, "cache": humanizer.get_cache_stats(), "fallback_chunks": fallbacks,
+                        "quality": await asyncio.to_thread(quality_report, text_to_humanize, result)}
+            if include_metrics:
+                response["metrics"] = humanizer.get_run_metrics()
+            return response
         
         else:
             # For any other mode (including work_in_progress), return an error
@@ -116,6 +289,356 @@ async def humanize_text(
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.post("/humanize/stream")
+async def humanize_text_stream(
+    prompt: str = Form(...),
+    mode: str = Form(...),
+    model: str = Form(default="llama-3.3-70b-versatile"),
+    iterations: int = Form(default=2),
+    ai_response: str = Form(default=""),
+    naive_prepass: bool = Form(default=False),
+    converge: bool = Form(default=False),
+    include_metrics: bool = Form(default=False)
+):
+    """
+    Streaming variant of /humanize.
+    
+    Emits newline-delimited JSON: one {"type": "chunk"} event per chunk as soon
+    as its last iteration finishes (with its index, since chunks can finish out
+    of order), then a final {"type": "done"} event with the assembled text.
+    The naive_replace mode finishes in milliseconds, so it returns plain JSON.
+    """
+    if mode not in ("llm_approach", "naive_replace"):
+        return {"success": False, "error": "This mode is not implemented yet."}
+    
+    model_error = unsupported_model_error(model)
+    if model_error:
+        return model_error
+    
+    text_to_humanize = ai_response if ai_response.strip() else prompt
+    if not text_to_humanize.strip():
+        return {"success": False, "error": "No text available to humanize. Please generate content first."}
+    
+    # Sanitize input text to prevent Unicode encoding errors
+    text_to_humanize = sanitize_unicode_text(text_to_humanize)
+    
+    if mode == "naive_replace":
+        return await asyncio.to_thread(humanize_naive, text_to_humanize)
+    
+    logger.info(
+        "Streaming humanization request received",
+        extra={"model": model, "iterations": iterations, "input_chars": len(text_to_humanize)}
+    )
+    
+    try:
+        humanizer = HumanizeTextWithGroq(model=model, naive_prepass=naive_prepass, converge=converge)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    
+    iterations = max(1, min(iterations, 5))
+    
+    async def event_stream():
+        chunks: Dict[int, str] = {}
+        try:
+            async for index, total, chunk in humanizer.aiter_humanize_text(text_to_humanize, n_iterations=iterations):
+                chunk = sanitize_unicode_text(chunk)
+                chunks[index] = chunk
+                yield json.dumps({"type": "chunk", "index": index, "total": total, "text": chunk}) + "\n"
+            
+            result = '\n\n'.join(chunks[i] for i in sorted(chunks))
+            done = {
+                "type": "done",
+                "result": result,
+                "cache": humanizer.get_cache_stats(),
+                "fallback_chunks": humanizer.get_fallbacks(),
+                "quality": await asyncio.to_thread(quality_report, text_to_humanize, result)
+            }
+            if include_metrics:
+                done["metrics"] = humanizer.get_run_metrics()
+            yield json.dumps(done) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.post("/score")
+async def score_text(text: str = Form(...)):
+    """
+    Score text for AI-sounding phrases locally (no Groq calls).
+    
+    Every phrase in the avoid-list is matched case-insensitively on word
+    boundaries. Hits are reported for the whole text and per paragraph.
+    """
+    try:
+        text = sanitize_unicode_text(text)
+        detector = get_default_detector()
+        overall = detector.score(text)
+        
+        segmented = SegmentedText(text)
+        paragraphs = [segmented.slice(span) for span in segmented.paragraphs]
+        chunks = [
+            {"index": i, "words": score.words, "total_hits": score.total_hits, "hits": score.hits}
+            for i, score in enumerate(detector.score_chunks(paragraphs))
+        ]
+        
+        return {
+            "success": True,
+            "total_hits": overall.total_hits,
+            "words": overall.words,
+            "hits_per_1000_words": overall.hits_per_1000_words,
+            "hits": overall.hits,
+            "chunks": chunks
+        }
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/jobs")
+async def submit_job(
+    prompt: str = Form(...),
+    model: str = Form(default="llama-3.3-70b-versatile"),
+    iterations: int = Form(default=2),
+    ai_response: str = Form(default=""),
+    naive_prepass: bool = Form(default=False),
+    converge: bool = Form(default=False)
+):
+    """
+    Queue an llm_approach humanization in the background and return its job id.
+    
+    Poll GET /jobs/{job_id} or follow GET /jobs/{job_id}/events for progress.
+    Finished chunks are checkpointed, so a restarted server resumes the job
+    instead of starting it over.
+    """
+    try:
+        model_error = unsupported_model_error(model)
+        if model_error:
+            return model_error
+        
+        text_to_humanize = ai_response if ai_response.strip() else prompt
+        if not text_to_humanize.strip():
+            return {"success": False, "error": "No text available to humanize. Please generate content first."}
+        
+        humanize_jobs = await get_job_queue()
+        job = await humanize_jobs.submit(sanitize_unicode_text(text_to_humanize), model, iterations,
+                                         naive_prepass=naive_prepass, converge=converge)
+        return {"success": True, "job": job}
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return a job's status, chunk progress and, once done, its result."""
+    humanize_jobs = await get_job_queue()
+    job = await humanize_jobs.get(job_id)
+    if job is None:
+        return {"success": False, "error": "Job not found."}
+    return {"success": True, "job": job}
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Follow a job's progress.
+    
+    Emits newline-delimited JSON {"type": "status"} events whenever the job
+    changes, ending with a {"type": "done"} or {"type": "failed"} event.
+    """
+    humanize_jobs = await get_job_queue()
+    if await humanize_jobs.get(job_id) is None:
+        return {"success": False, "error": "Job not found."}
+    
+    async def status_stream():
+        async for job in humanize_jobs.subscribe(job_id):
+            event_type = job["status"] if job["status"] in FINISHED_STATES else "status"
+            yield json.dumps({"type": event_type, "job": job}) + "\n"
+    
+    return StreamingResponse(status_stream(), media_type="application/x-ndjson")
+
+class BatchDocument(BaseModel):
+    id: str
+    text: str
+
+class BatchHumanizeRequest(BaseModel):
+    documents: List[BatchDocument]
+    mode: str = "llm_approach"
+    model: str = "llama-3.3-70b-versatile"
+    iterations: int = 2
+    max_concurrency: Optional[int] = None
+    naive_prepass: bool = False
+    converge: bool = False
+    include_metrics: bool = False
+
+def naive_batch(documents: Dict[str, str]) -> Dict[str, str]:
+    """
+    Humanize every document of a batch with the local phrase-replacement engine.
+    
+    Args:
+        documents: Input text by document id
+        
+    Returns:
+        Humanized text by document id
+    """
+    return {doc_id: naive_humanize(text)[0] for doc_id, text in documents.items()}
+
+def batch_quality(documents: Dict[str, str], results: Dict[str, str]) -> Dict[str, Dict]:
+    """
+    Score every document of a batch against its result in one vectorized pass.
+    
+    Args:
+        documents: Input text by document id
+        results: Humanized text by document id
+        
+    Returns:
+        Quality report by document id
+    """
+    from text_metrics import quality_reports
+    
+    doc_ids = list(documents)
+    reports = quality_reports([documents[doc_id] for doc_id in doc_ids], [results[doc_id] for doc_id in doc_ids])
+    return dict(zip(doc_ids, reports))
+
+@app.post("/humanize/batch")
+async def humanize_batch(request: BatchHumanizeRequest):
+    """
+    Humanize many documents in one request.
+    
+    Every document is chunked up front and all chunks share one concurrency
+    budget, so per-request overhead is paid once for the whole batch.
+    Results are returned keyed by document id.
+    """
+    try:
+        if request.mode not in ("llm_approach", "naive_replace"):
+            return {"success": False, "error": "This mode is not implemented yet."}
+        
+        model_error = unsupported_model_error(request.model)
+        if model_error:
+            return model_error
+        
+        if not request.documents:
+            return {"success": False, "error": "No documents provided."}
+        
+        max_documents = max_batch_documents()
+        if len(request.documents) > max_documents:
+            return {"success": False, "error": f"Too many documents: at most {max_documents} per batch."}
+        
+        documents = {doc.id: sanitize_unicode_text(doc.text) for doc in request.documents}
+        if len(documents) != len(request.documents):
+            return {"success": False, "error": "Document ids must be unique."}
+        
+        logger.info(
+            "Batch humanization request received",
+            extra={"model": request.model, "mode": request.mode, "documents": len(documents)}
+        )
+        
+        if request.mode == "naive_replace":
+            results = await asyncio.to_thread(naive_batch, documents)
+            return {"success": True, "results": results, "quality": await asyncio.to_thread(batch_quality, documents, results)}
+        
+        humanizer = HumanizeTextWithGroq(model=request.model, naive_prepass=request.naive_prepass,
+                                         converge=request.converge)
+        concurrency_limit = batch_max_concurrency()
+        max_concurrency = max(1, min(request.max_concurrency or concurrency_limit, concurrency_limit))
+        
+        results = await humanizer.ahumanize_batch(documents, n_iterations=request.iterations, max_concurrency=max_concurrency)
+        results = {doc_id: sanitize_unicode_text(text) for doc_id, text in results.items()}
+        
+        logger.info("Batch humanization request completed", extra={"model": request.model, "documents": len(results)})
+        
+        response = {"success": True, "results": results, "cache": humanizer.get_cache_stats(), "fallback_chunks": humanizer.get_fallbacks(),
+                    "quality": await asyncio.to_thread(batch_quality, documents, results)}
+        if request.include_metrics:
+            response["metrics"] = humanizer.get_run_metrics()
+        return response
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+async def summarize_chat_turns(model: str, previous_summary: str, turns: List[Dict[str, str]]) -> str:
+    """
+    Fold older chat turns into a running summary with one small Groq call.
+    
+    Args:
+        model: Groq model to summarize with
+        previous_summary: Summary of turns compacted earlier ("" if none)
+        turns: Turns that have just fallen out of the token budget
+        
+    Returns:
+        Updated summary text
+    """
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    messages = [
+        {"role": "system", "content": "Summarize this conversation in under 200 words. Keep facts, names, decisions and open questions. Only return the summary."},
+        {"role": "user", "content": f"Existing summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"}
+    ]
+    client = get_async_groq_client(model=model)
+    completion = await get_scheduler(model).acall(
+        lambda: client.chat.completions.create(messages=messages, model=model, temperature=0.3, max_tokens=300),
+        estimate_tokens(messages) + 300
+    )
+    return sanitize_unicode_text(completion.choices[0].message.content.strip())
+
+async def prepare_chat_payload(message: str, model: str, session_id: str) -> Dict:
+    """
+    Add the user message to the session history and build the Groq payload.
+    
+    Only the system prompt and the most recent turns that fit the token
+    budget are sent; older turns are dropped or summarized by the chat context manager.
+    
+    Args:
+        message: Raw user message
+        model: Groq model to chat with
+        session_id: Conversation identifier
+        
+    Returns:
+        Keyword arguments for client.chat.completions.create
+    """
+    # Sanitize user message and add to conversation history (the store creates new sessions);
+    # the SQLite store can wait on other workers' writes, so it runs in a thread
+    message = sanitize_unicode_text(message)
+    chat_sessions = get_chat_sessions()
+    await asyncio.to_thread(chat_sessions.append_message, session_id, "user", message)
+    history = await asyncio.to_thread(chat_sessions.get_messages, session_id)
+    messages = await get_chat_context().abuild(
+        session_id, history, model, CHAT_MAX_TOKENS,
+        summarizer=lambda summary, turns: summarize_chat_turns(model, summary, turns)
+    )
+    
+    groq_payload = {
+        "messages": messages,
+        "model": model,
+        "temperature": 0.7,
+        "max_tokens": CHAT_MAX_TOKENS
+    }
+    
+    # Log chat request details; message contents are only logged at debug level
+    logger.info(
+        "Chat request",
+        extra={"model": model, "session_id": session_id, "history_messages": len(history), "sent_messages": len(messages)}
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Chat payload: %d messages, ~%d tokens",
+            len(messages), sum(count_message_tokens(m) for m in messages), extra={"session_id": session_id}
+        )
+        for i, msg in enumerate(messages):
+            logger.debug("Message %d %s: %.100s", i + 1, msg["role"], msg["content"], extra={"session_id": session_id})
+    
+    return groq_payload
+
+async def record_chat_reply(session_id: str, result: str):
+    """
+    Log the assistant reply and append it to the session history.
+    
+    Args:
+        session_id: Conversation identifier
+        result: Sanitized assistant reply
+    """
+    logger.info("Chat response received", extra={"session_id": session_id, "response_chars": len(result)})
+    logger.debug("Chat response: %.150s", result, extra={"session_id": session_id})
+    
+    # Add assistant response to conversation history
+    await asyncio.to_thread(get_chat_sessions().append_message, session_id, "assistant", result)
+
 @app.post("/chat")
 async def chat(
     message: str = Form(...),
@@ -123,73 +646,87 @@ async def chat(
     session_id: str = Form(default="default")
 ):
     try:
-        # Initialize session if it doesn't exist
-        if session_id not in chat_sessions:
-            chat_sessions[session_id] = [
-                {"role": "system", "content": "You are a helpful AI assistant. Provide clear, concise, and helpful responses."}
-            ]
-        
-        # Sanitize user message and add to conversation history
-        message = sanitize_unicode_text(message)
-        chat_sessions[session_id].append({"role": "user", "content": message})
-        
-        # Log chat request details
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"\n[{timestamp}] 💬 CHAT REQUEST TO GROQ")
-        print(f"[{timestamp}] 🎯 Model: {model}")
-        print(f"[{timestamp}] 🆔 Session ID: {session_id}")
-        print(f"[{timestamp}] 📝 User Message: {message}")
-        print(f"[{timestamp}] 📚 Conversation History Length: {len(chat_sessions[session_id])} messages")
-        
-        # Prepare and log the full payload
-        groq_payload = {
-            "messages": chat_sessions[session_id],
-            "model": model,
-            "temperature": 0.7,
-            "max_tokens": 4000
-        }
+        model_error = unsupported_model_error(model)
+        if model_error:
+            return model_error
         
-        print(f"[{timestamp}] 📦 FULL GROQ PAYLOAD:")
-        print(f"[{timestamp}]   Model: {groq_payload['model']}")
-        print(f"[{timestamp}]   Temperature: {groq_payload['temperature']}")
-        print(f"[{timestamp}]   Max Tokens: {groq_payload['max_tokens']}")
-        print(f"[{timestamp}]   Messages ({len(groq_payload['messages'])}):")
-        for i, msg in enumerate(groq_payload['messages']):
-            content_preview = msg['content'][:100] + "..." if len(msg['content']) > 100 else msg['content']
-            print(f"[{timestamp}]     {i+1}. {msg['role']}: {content_preview}")
-        print(f"[{timestamp}] " + "="*50)
+        groq_payload = await prepare_chat_payload(message, model, session_id)
         
-        # Get completion with full conversation history
-        completion = client.chat.completions.create(**groq_payload)
+        # Get completion with full conversation history using the pooled async client
+        client = get_async_groq_client(model=model)
+        completion = await get_scheduler(model).acall(
+            lambda: client.chat.completions.create(**groq_payload),
+            estimate_tokens(groq_payload["messages"]) + groq_payload["max_tokens"] // 4
+        )
         
         result = completion.choices[0].message.content
         
         # Sanitize the AI response
         result = sanitize_unicode_text(result)
         
-        # Log response details
-        response_timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"\n[{response_timestamp}] ✅ GROQ RESPONSE RECEIVED")
-        print(f"[{response_timestamp}] 📤 Response Length: {len(result)} characters")
-        print(f"[{response_timestamp}] 📝 Response Preview: {result[:150]}{'...' if len(result) > 150 else ''}")
-        print(f"[{response_timestamp}] 🔄 Updated conversation history to {len(chat_sessions[session_id]) + 1} messages")
-        
-        # Add assistant response to conversation history
-        chat_sessions[session_id].append({"role": "assistant", "content": result})
+        await record_chat_reply(session_id, result)
         
         return {"success": True, "result": result}
     
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.post("/chat/stream")
+async def chat_stream(
+    message: str = Form(...),
+    model: str = Form(default="llama-3.3-70b-versatile"),
+    session_id: str = Form(default="default")
+):
+    """
+    Streaming variant of /chat.
+    
+    Emits newline-delimited JSON {"type": "token"} events as model tokens
+    arrive, then a {"type": "done"} event with the full reply. The assembled
+    reply is added to the session history only once the stream completes.
+    """
+    model_error = unsupported_model_error(model)
+    if model_error:
+        return model_error
+    
+    try:
+        groq_payload = await prepare_chat_payload(message, model, session_id)
+        client = get_async_groq_client(model=model)
+        # Only opening the stream is retried; tokens already sent cannot be replayed
+        stream = await get_scheduler(model).acall(
+            lambda: client.chat.completions.create(**groq_payload, stream=True),
+            estimate_tokens(groq_payload["messages"]) + groq_payload["max_tokens"] // 4
+        )
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    
+    async def token_stream():
+        parts: List[str] = []
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    parts.append(token)
+                    yield json.dumps({"type": "token", "content": token}) + "\n"
+            
+            result = sanitize_unicode_text("".join(parts))
+            await record_chat_reply(session_id, result)
+            yield json.dumps({"type": "done", "result": result}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        finally:
+            # Also runs when the client disconnects (CancelledError), so the upstream connection is released
+            await stream.close()
+    
+    return StreamingResponse(token_stream(), media_type="application/x-ndjson")
+
 @app.post("/clear-chat")
 async def clear_chat(session_id: str = Form(default="default")):
     try:
         # Clear the conversation history for the session
-        if session_id in chat_sessions:
-            chat_sessions[session_id] = [
-                {"role": "system", "content": "You are a helpful AI assistant. Provide clear, concise, and helpful responses."}
-            ]
+        await asyncio.to_thread(get_chat_sessions().reset, session_id)
+        get_chat_context().forget(session_id)
         
         return {"success": True, "message": "Chat history cleared"}
     
@@ -197,4 +734,6 @@ async def clear_chat(session_id: str = Form(default="default")):
         return {"success": False, "error": str(e)}
 
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Cold-start time and per-worker memory of the FastAPI app.
+
+Each sample runs in a fresh interpreter, the way a new server worker starts:
+it times importing backend.main and the app's startup hooks, then serves a
+first /humanize request against a local mock Groq server (so the Groq client
+is created). Resident memory is reported after each step. Run from the
+repository root:
+
+    python -m benchmarks.measure_startup
+    python -m benchmarks.measure_startup --samples 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_groq_server import MockGroqServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter and prints one JSON line
+_PROBE = r"""
+import asyncio, json, resource, sys, time
+
+def rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+started = time.perf_counter()
+from backend.main import app, startup, shutdown
+imported = time.perf_counter()
+import_rss = rss_mb()
+groq_loaded = "groq" in sys.modules
+
+async def run():
+    import httpx
+    before = time.perf_counter()
+    await startup()
+    ready = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://probe") as client:
+        response = await client.post("/humanize", data={"prompt": "Moreover, this is a short test.", "mode": "llm_approach"})
+    served = time.perf_counter()
+    await shutdown()
+    return ready - before, served - ready, response.json().get("success", False)
+
+startup_s, first_request_s, ok = asyncio.run(run())
+print(json.dumps({
+    "import_s": imported - started,
+    "startup_s": startup_s,
+    "first_request_s": first_request_s,
+    "import_rss_mb": import_rss,
+    "first_request_rss_mb": rss_mb(),
+    "ok": ok,
+    "groq_loaded_at_import": groq_loaded,
+}))
+"""
+
+
+def sample(env) -> dict:
+    output = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start time and memory of a server worker.")
+    parser.add_argument("--samples", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--output", help="Write the medians as JSON to this file")
+    args = parser.parse_args()
+
+    server = MockGroqServer(latency=0.0, jitter=0.0).start()
+    state_dir = tempfile.mkdtemp(prefix="humanizer-startup-")
+    env = dict(
+        os.environ,
+        GROQ_BASE_URL=server.base_url,
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", "mock-key"),
+        HUMANIZER_LOG_LEVEL="ERROR",
+        HUMANIZER_CACHE_SIZE="0",
+        HUMANIZER_JOB_DB=os.path.join(state_dir, "jobs.db"),
+    )
+    try:
+        samples = [sample(env) for _ in range(args.samples)]
+    finally:
+        server.stop()
+
+    medians = {
+        name: round(statistics.median(s[name] for s in samples), 3)
+        for name in ("import_s", "startup_s", "first_request_s", "import_rss_mb", "first_request_rss_mb")
+    }
+    errors = sum(1 for s in samples if not s["ok"])
+    print(f"{'median of':<22}{args.samples} fresh workers ({errors} failed first requests, "
+          f"groq SDK loaded at import: {samples[0]['groq_loaded_at_import']})")
+    print(f"{'import backend.main':<22}{medians['import_s'] * 1000:>8.0f} ms {medians['import_rss_mb']:>8.1f} MB")
+    print(f"{'startup hooks':<22}{medians['startup_s'] * 1000:>8.0f} ms")
+    print(f"{'first /humanize':<22}{medians['first_request_s'] * 1000:>8.0f} ms {medians['first_request_rss_mb']:>8.1f} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"samples": args.samples, "medians": medians}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Local stand-in for the Groq chat-completions API.
+
+Speaks enough of POST /openai/v1/chat/completions (JSON and server-sent
+event streaming) for the groq SDK, with configurable latency, jitter, error
+and 429 rates. Point the app at it with GROQ_BASE_URL, e.g.:
+
+    python -m benchmarks.mock_groq_server --port 8001 --latency 0.3
+    GROQ_BASE_URL=http://127.0.0.1:8001 GROQ_API_KEY=mock python run.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+# End of the instructions that precede the text in humanization and final-pass prompts
+_PROMPT_ENDS = ("words).\n\n", "Target: maintain same length.\n\n")
+
+
+def _reply_for(messages: List[Dict[str, str]]) -> str:
+    # Echo the text being worked on so word counts behave like a real rewrite: the
+    # instructions are stripped from humanization prompts (the chunk itself can span
+    # several paragraphs), and chat turns are echoed whole
+    user_messages = [m.get("content") or "" for m in messages if m.get("role") == "user"]
+    if not user_messages:
+        return "OK."
+    content = user_messages[-1]
+    for prompt_end in _PROMPT_ENDS:
+        instructions, found, text = content.partition(prompt_end)
+        if found:
+            return text.strip() or content
+    return content
+
+
+class MockGroqServer:
+    """
+    Threaded HTTP server imitating the Groq chat-completions endpoint.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2, jitter: float = 0.05,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 0.2,
+                 tokens_per_second: float = 500.0, seed: int = 0):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Mean time before the response starts, in seconds
+            jitter: Maximum deviation from the mean latency, in seconds
+            error_rate: Fraction of requests answered with a 500 error
+            rate_limit_rate: Fraction of requests answered with a 429 and a retry-after header
+            retry_after: Seconds advertised in the retry-after header of 429 responses
+            tokens_per_second: Speed at which streamed tokens are emitted
+            seed: Random seed, so runs are repeatable
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.tokens_per_second = tokens_per_second
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.requests = 0
+
+        server = self
+
+        class Handler(_ChatCompletionsHandler):
+            mock = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> float:
+        with self._random_lock:
+            self.requests += 1
+            return self._random.random()
+
+    def delay(self) -> float:
+        with self._random_lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def start(self) -> "MockGroqServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mock: MockGroqServer = None
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+            return
+
+        request = json.loads(body or b"{}")
+        mock = self.mock
+        draw = mock.draw()
+        time.sleep(mock.delay())
+
+        if draw < mock.rate_limit_rate:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "tokens", "code": "rate_limit_exceeded"}},
+                {"retry-after": f"{mock.retry_after:g}", "retry-after-ms": str(int(mock.retry_after * 1000))},
+            )
+            return
+        if draw < mock.rate_limit_rate + mock.error_rate:
+            self._send_json(500, {"error": {"message": "Internal server error (mock)", "type": "internal_server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        model = request.get("model", "mock-model")
+        reply = _reply_for(messages)
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        completion_tokens = max(1, len(reply) // 4)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if request.get("stream"):
+            self._stream(completion_id, created, model, reply)
+            return
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream(self, completion_id: str, created: int, model: str, reply: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def event(delta: Dict, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason, "logprobs": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        words = reply.split(" ")
+        pause = 1.0 / self.mock.tokens_per_second if self.mock.tokens_per_second > 0 else 0.0
+        for i, word in enumerate(words):
+            event({"content": word if i == 0 else " " + word})
+            if pause:
+                time.sleep(pause)
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the Groq chat-completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Maximum latency deviation in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests failing with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockGroqServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                            error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    print(f"Mock Groq API listening on {server.base_url} (set GROQ_BASE_URL to this)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Offline load benchmarks for the humanizer and the FastAPI app.
+
+Starts a local mock Groq server, points the app at it and runs load
+scenarios in-process, reporting p50/p95/p99 latency, requests per second
+and memory. No API quota is used. Run from the repository root:
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --scenario chat_sessions --concurrency 32 --latency 0.5
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --compare results.json   # exit 1 on a p95 or RPS regression
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_groq_server import MockGroqServer
+
+# Sentences full of stock AI phrasing, so the naive replacer has work to do
+_SENTENCES = [
+    "In today's fast-paced world, it is important to note that technology plays a crucial role in our lives.",
+    "Moreover, organizations must delve into innovative solutions to unlock the potential of their teams.",
+    "Furthermore, this transformative approach paves the way for seamless integration across departments.",
+    "In conclusion, the rapid pace of development opens up exciting possibilities for everyone involved.",
+    "Additionally, leaders should foster a culture of learning to navigate the evolving landscape.",
+    "It is worth noting that data-driven decisions significantly enhance operational efficiency.",
+]
+
+
+def make_document(words: int, seed: int) -> str:
+    """Build a deterministic document of roughly `words` words in paragraphs of about 120 words."""
+    rng = random.Random(seed)
+    paragraphs, current, count, paragraph_words = [], [], 0, 0
+    while count < words:
+        sentence = rng.choice(_SENTENCES)
+        current.append(sentence)
+        count += len(sentence.split())
+        paragraph_words += len(sentence.split())
+        if paragraph_words >= 120:
+            paragraphs.append(" ".join(current))
+            current, paragraph_words = [], 0
+    if current:
+        paragraphs.append(" ".join(current))
+    return "\n\n".join(paragraphs)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def run_load(operations: List[Callable[[], Awaitable]], concurrency: int) -> Dict:
+    """
+    Run operations with at most `concurrency` in flight and time each of them.
+
+    Args:
+        operations: Zero-argument coroutine functions. Each returns True on
+            success, or for operations made of several sequential requests
+            (a chat session) a list of (success, seconds) pairs, one per request
+        concurrency: Maximum number of operations in flight
+
+    Returns:
+        Latency, throughput and error statistics
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def timed(operation):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                outcome = await operation()
+            except Exception:
+                outcome = False
+            requests = outcome if isinstance(outcome, list) else [(outcome, time.perf_counter() - started)]
+            for ok, seconds in requests:
+                latencies.append(seconds)
+                if not ok:
+                    errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(operation) for operation in operations))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "wall_s": round(elapsed, 2),
+    }
+
+
+def _succeeded(response) -> bool:
+    return response.status_code == 200 and response.json().get("success", False)
+
+
+def build_scenarios(client, args) -> Dict[str, Callable[[], List[Callable[[], Awaitable[bool]]]]]:
+    """
+    Map scenario names to factories of the operations they run.
+
+    Args:
+        client: httpx.AsyncClient bound to the app
+        args: Parsed command line arguments
+    """
+    from humanize_using_groq import HumanizeTextWithGroq
+
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+
+    def humanize_form(text: str, mode: str = "llm_approach") -> Dict[str, str]:
+        return {"prompt": text, "mode": mode, "model": args.model, "iterations": str(args.iterations)}
+
+    def library_long_doc():
+        # HumanizeTextWithGroq directly, without the HTTP layer
+        text = make_document(args.long_words, seed=1)
+        humanizer = HumanizeTextWithGroq(model=args.model, use_cache=False)
+
+        async def operation():
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(executor, humanizer.humanize_text, text, args.iterations)
+            return bool(result)
+        return [operation for _ in range(args.requests)]
+
+    def humanize_long_doc():
+        form = humanize_form(make_document(args.long_words, seed=2))
+
+        async def operation():
+            return _succeeded(await client.post("/humanize", data=form))
+        return [operation for _ in range(args.requests)]
+
+    def humanize_short_docs():
+        def operation_for(i):
+            form = humanize_form(make_document(args.short_words, seed=100 + i))
+
+            async def operation():
+                return _succeeded(await client.post("/humanize", data=form))
+            return operation
+        return [operation_for(i) for i in range(args.requests)]
+
+    def naive_replace():
+        form = humanize_form(make_document(args.long_words, seed=3), mode="naive_replace")
+
+        async def operation():
+            return _succeeded(await client.post("/humanize", data=form))
+        return [operation for _ in range(args.requests)]
+
+    def chat_sessions():
+        # `concurrency` sessions, each sending its turns in order
+        turns = max(1, args.requests // args.concurrency)
+
+        def session(i):
+            async def operation():
+                timings = []
+                for turn in range(turns):
+                    started = time.perf_counter()
+                    response = await client.post("/chat", data={
+                        "message": f"Turn {turn}: {_SENTENCES[(i + turn) % len(_SENTENCES)]}",
+                        "model": args.model,
+                        "session_id": f"bench-{i}",
+                    })
+                    timings.append((_succeeded(response), time.perf_counter() - started))
+                return timings
+            return operation
+        return [session(i) for i in range(args.concurrency)]
+
+    return {
+        "library_long_doc": library_long_doc,
+        "humanize_long_doc": humanize_long_doc,
+        "humanize_short_docs": humanize_short_docs,
+        "naive_replace": naive_replace,
+        "chat_sessions": chat_sessions,
+    }
+
+
+async def run_scenarios(args) -> Dict[str, Dict]:
+    import httpx
+    from backend.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        scenarios = build_scenarios(client, args)
+        names = list(scenarios) if args.scenario == "all" else [args.scenario]
+        for name in names:
+            operations = scenarios[name]()
+            if args.trace_memory:
+                tracemalloc.start()
+            stats = await run_load(operations, args.concurrency)
+            if args.trace_memory:
+                stats["peak_alloc_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+                tracemalloc.stop()
+            stats["max_rss_mb"] = round(max_rss_mb(), 1)
+            results[name] = stats
+            print_row(name, stats)
+    return results
+
+
+def print_row(name: str, stats: Dict):
+    print(f"{name:<22}{stats['requests']:>6}{stats['errors']:>7}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+          f"{stats['p99_ms']:>10}{stats['rps']:>9}{stats['max_rss_mb']:>9}")
+
+
+def compare(results: Dict[str, Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    List scenarios whose p95 latency or throughput regressed beyond the tolerance.
+
+    Args:
+        results: Results of this run
+        baseline_path: JSON file written by an earlier run with --output
+        tolerance: Allowed relative change (0.2 = 20%)
+
+    Returns:
+        Human-readable regression descriptions (empty when there are none)
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms")
+        if before["rps"] and stats["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {before['rps']} -> {stats['rps']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the humanizer against a local mock Groq API.")
+    parser.add_argument("--scenario", default="all",
+                        choices=["all", "library_long_doc", "humanize_long_doc", "humanize_short_docs",
+                                 "naive_replace", "chat_sessions"])
+    parser.add_argument("--requests", type=int, default=40, help="Operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Operations in flight")
+    parser.add_argument("--model", default="llama-3.3-70b-versatile")
+    parser.add_argument("--iterations", type=int, default=2, help="Humanization passes per chunk")
+    parser.add_argument("--long-words", type=int, default=3000, help="Words in the long document")
+    parser.add_argument("--short-words", type=int, default=150, help="Words in each short document")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock API latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Mock API latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock API calls failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of mock API calls failing with 429")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python allocations (slower)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from --output to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression for --compare")
+    args = parser.parse_args()
+
+    server = MockGroqServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            rate_limit_rate=args.rate_limit_rate).start()
+
+    # Configure the app before it is imported: talk to the mock, no quota limits, no result
+    # cache or coalescing (repeated inputs would otherwise be served locally) and quiet logs
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "mock-key")
+    os.environ.setdefault("GROQ_RPM_LIMIT", "0")
+    os.environ.setdefault("GROQ_TPM_LIMIT", "0")
+    os.environ.setdefault("HUMANIZER_CACHE_SIZE", "0")
+    os.environ.setdefault("HUMANIZER_COALESCE", "0")
+    os.environ.setdefault("HUMANIZER_LOG_LEVEL", "ERROR")
+
+    print(f"Mock Groq API at {server.base_url}: latency {args.latency}s ±{args.jitter}s, "
+          f"errors {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%}, concurrency {args.concurrency}")
+    print(f"{'scenario':<22}{'reqs':>6}{'errors':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}{'rss MB':>9}")
+    try:
+        results = asyncio.run(run_scenarios(args))
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
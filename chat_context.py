@@ -0,0 +1,209 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from model_limits import get_model_limits
+
+# Words, numbers and individual punctuation marks, roughly how BPE tokenizers split text
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Per-message overhead for role markers and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text locally, without a tokenizer.
+
+    Each word-like piece counts as one token per four characters (at least
+    one), and each punctuation mark as one token. This tracks BPE tokenizers
+    closely enough for budgeting.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def count_message_tokens(message: Dict[str, str]) -> int:
+    """
+    Estimate the tokens a chat message occupies in the prompt.
+
+    Args:
+        message: {"role", "content"} message
+
+    Returns:
+        Estimated token count including per-message overhead
+    """
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _message_digest(message: Dict[str, str]) -> str:
+    return hashlib.sha1(f"{message['role']}\0{message['content']}".encode("utf-8")).hexdigest()
+
+
+class ChatContextManager:
+    """
+    Keeps the prompt sent to /chat within a per-model token budget.
+
+    The system prompt and the most recent turns that fit are always sent.
+    Older turns are compacted: with the "truncate" strategy they are simply
+    dropped, and with "summarize" they are folded into a running summary.
+    Each turn is summarized once, and the summary is cached per session.
+    Prompt size, and so latency, stays flat however long a session runs.
+    """
+
+    def __init__(self, token_budget: int = 6000, strategy: str = "truncate",
+                 summary_token_reserve: int = 400, max_cached_sessions: int = 10000):
+        """
+        Args:
+            token_budget: Maximum prompt tokens for a chat request
+            strategy: "truncate" to drop old turns, "summarize" to summarize them
+            summary_token_reserve: Tokens set aside for the summary message
+            max_cached_sessions: Number of session summaries kept (LRU)
+        """
+        if strategy not in ("truncate", "summarize"):
+            raise ValueError(f"Unknown context strategy: {strategy}")
+        self.token_budget = token_budget
+        self.strategy = strategy
+        self.summary_token_reserve = summary_token_reserve
+        self.max_cached_sessions = max_cached_sessions
+        # session_id -> (summary text, digests of the messages it covers)
+        self._summaries: "OrderedDict[str, Tuple[str, Set[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def budget_for(self, model: str, max_completion_tokens: int) -> int:
+        """
+        Prompt token budget for a model, leaving room for the completion.
+
+        Args:
+            model: Groq model name
+            max_completion_tokens: max_tokens requested for the reply
+
+        Returns:
+            Number of prompt tokens allowed
+        """
+        window = get_model_limits(model).context_window
+        return max(256, min(self.token_budget, window - max_completion_tokens))
+
+    def split(self, messages: List[Dict[str, str]], budget: int) -> Tuple[List[Dict[str, str]], List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Split a conversation into system messages, turns to compact and turns to keep.
+
+        Args:
+            messages: Full conversation, starting with the system message
+            budget: Prompt token budget for the kept messages
+
+        Returns:
+            Tuple of (system messages, older turns to compact, recent turns to keep)
+        """
+        system = [m for m in messages[:1] if m["role"] == "system"]
+        turns = messages[len(system):]
+
+        remaining = budget - sum(count_message_tokens(m) for m in system)
+        keep_from = len(turns)
+        # Walk backwards from the newest turn; the newest one is always kept
+        while keep_from > 0:
+            cost = count_message_tokens(turns[keep_from - 1])
+            if cost > remaining and keep_from < len(turns):
+                break
+            remaining -= cost
+            keep_from -= 1
+        return system, turns[:keep_from], turns[keep_from:]
+
+    def build(self, messages: List[Dict[str, str]], model: str, max_completion_tokens: int) -> List[Dict[str, str]]:
+        """
+        Build a budgeted prompt by dropping the oldest turns that do not fit.
+
+        Args:
+            messages: Full conversation, starting with the system message
+            model: Groq model name
+            max_completion_tokens: max_tokens requested for the reply
+
+        Returns:
+            Messages to send to the model
+        """
+        system, _, recent = self.split(messages, self.budget_for(model, max_completion_tokens))
+        return system + recent
+
+    async def abuild(self, session_id: str, messages: List[Dict[str, str]], model: str,
+                     max_completion_tokens: int, summarizer: Optional[Summarizer] = None) -> List[Dict[str, str]]:
+        """
+        Build a budgeted prompt, summarizing compacted turns when configured.
+
+        Args:
+            session_id: Conversation identifier (summary cache key)
+            messages: Full conversation, starting with the system message
+            model: Groq model name
+            max_completion_tokens: max_tokens requested for the reply
+            summarizer: Async callable (previous summary, new turns) -> updated summary;
+                required for the "summarize" strategy
+
+        Returns:
+            Messages to send to the model
+        """
+        budget = self.budget_for(model, max_completion_tokens)
+        if self.strategy == "truncate" or summarizer is None:
+            return self.build(messages, model, max_completion_tokens)
+
+        system, older, recent = self.split(messages, budget - self.summary_token_reserve)
+        if not older:
+            return system + recent
+
+        with self._lock:
+            summary, covered = self._summaries.get(session_id, ("", set()))
+        older_digests = [_message_digest(m) for m in older]
+        new_turns = [m for m, digest in zip(older, older_digests) if digest not in covered]
+
+        if new_turns:
+            # Only turns that have not been summarized before are sent to the summarizer
+            try:
+                summary = await summarizer(summary, new_turns)
+            except Exception:
+                # A failed summary must not fail the chat turn; fall back to truncation
+                return system + recent
+            # Forget digests of turns the session store has since trimmed, so the set stays bounded
+            covered = set(older_digests)
+            with self._lock:
+                self._summaries[session_id] = (summary, covered)
+                self._summaries.move_to_end(session_id)
+                while len(self._summaries) > self.max_cached_sessions:
+                    self._summaries.popitem(last=False)
+
+        summary_message = {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+        return system + [summary_message] + recent
+
+    def forget(self, session_id: str):
+        """
+        Drop the cached summary of a session (e.g. when it is cleared).
+
+        Args:
+            session_id: Conversation identifier
+        """
+        with self._lock:
+            self._summaries.pop(session_id, None)
+
+
+def create_context_manager() -> ChatContextManager:
+    """
+    Build the chat context manager configured by environment variables.
+
+    CHAT_CONTEXT_TOKEN_BUDGET sets the prompt budget and CHAT_CONTEXT_STRATEGY
+    selects "truncate" (default) or "summarize".
+
+    Returns:
+        Configured ChatContextManager
+    """
+    return ChatContextManager(
+        token_budget=int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "6000")),
+        strategy=os.getenv("CHAT_CONTEXT_STRATEGY", "truncate").lower(),
+    )
@@ -0,0 +1,347 @@
+import abc
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+def _message_size(message: Dict[str, str]) -> int:
+    # Approximate memory cost of a message in bytes
+    return len(message["role"]) + len(message["content"].encode("utf-8"))
+
+
+class ChatSessionStore(abc.ABC):
+    """
+    Interface for chat session storage.
+
+    A session is a list of {"role", "content"} messages that always starts
+    with the system message. Implementations bound the number of messages
+    per session, evict sessions that have been idle longer than a TTL,
+    and keep the total stored content under a global budget.
+    """
+
+    def __init__(self, system_message: str, max_messages: int = 100,
+                 idle_ttl_seconds: Optional[float] = 3600, max_total_bytes: int = 50 * 1024 * 1024):
+        """
+        Args:
+            system_message: Content of the system message new sessions start with
+            max_messages: Maximum messages kept per session, including the system message
+            idle_ttl_seconds: Sessions idle for longer than this are evicted (None = never)
+            max_total_bytes: Budget for all stored message content; least recently used
+                sessions are evicted when it is exceeded
+        """
+        self.system_message = {"role": "system", "content": system_message}
+        self.max_messages = max(2, max_messages)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_total_bytes = max_total_bytes
+
+    @abc.abstractmethod
+    def get_messages(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Return a copy of the session's messages, creating the session if needed.
+
+        Args:
+            session_id: Conversation identifier
+
+        Returns:
+            List of messages starting with the system message
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def append_message(self, session_id: str, role: str, content: str):
+        """
+        Append a message to the session, trimming the oldest turns past the cap.
+
+        Args:
+            session_id: Conversation identifier
+            role: Message role ("user" or "assistant")
+            content: Message text
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def reset(self, session_id: str):
+        """
+        Clear a session back to just the system message.
+
+        Args:
+            session_id: Conversation identifier
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def evict_expired(self) -> int:
+        """
+        Remove sessions that have been idle longer than the TTL.
+
+        Returns:
+            Number of sessions removed
+        """
+        raise NotImplementedError
+
+
+class _Session:
+    __slots__ = ("messages", "last_access", "size")
+
+    def __init__(self, messages: List[Dict[str, str]], last_access: float):
+        self.messages = messages
+        self.last_access = last_access
+        self.size = sum(_message_size(message) for message in messages)
+
+
+class InMemoryChatSessionStore(ChatSessionStore):
+    """
+    Process-local session store.
+
+    Sessions are kept in least-recently-used order, so expired sessions and
+    budget evictions are always taken from the front in amortized O(1).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _touch(self, session_id: str, now: float) -> _Session:
+        # Caller must hold self._lock
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = _Session([dict(self.system_message)], now)
+            self._sessions[session_id] = session
+            self._total_bytes += session.size
+        else:
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _remove(self, session_id: str):
+        # Caller must hold self._lock
+        session = self._sessions.pop(session_id)
+        self._total_bytes -= session.size
+
+    def _evict_expired_locked(self, now: float) -> int:
+        if self.idle_ttl_seconds is None:
+            return 0
+        removed = 0
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access <= self.idle_ttl_seconds:
+                break
+            self._remove(session_id)
+            removed += 1
+        return removed
+
+    def _enforce_budget_locked(self, keep_session_id: str):
+        while self._total_bytes > self.max_total_bytes and len(self._sessions) > 1:
+            oldest_id = next(iter(self._sessions))
+            if oldest_id == keep_session_id:
+                # The active session is the most recently used, so this only happens when it is alone
+                break
+            self._remove(oldest_id)
+
+    def get_messages(self, session_id: str) -> List[Dict[str, str]]:
+        now = time.time()
+        with self._lock:
+            self._evict_expired_locked(now)
+            session = self._touch(session_id, now)
+            return [dict(message) for message in session.messages]
+
+    def append_message(self, session_id: str, role: str, content: str):
+        now = time.time()
+        message = {"role": role, "content": content}
+        with self._lock:
+            self._evict_expired_locked(now)
+            session = self._touch(session_id, now)
+            session.messages.append(message)
+            added = _message_size(message)
+            session.size += added
+            self._total_bytes += added
+
+            # Keep the system message plus the most recent turns
+            overflow = len(session.messages) - self.max_messages
+            if overflow > 0:
+                dropped = session.messages[1:1 + overflow]
+                del session.messages[1:1 + overflow]
+                freed = sum(_message_size(m) for m in dropped)
+                session.size -= freed
+                self._total_bytes -= freed
+
+            self._enforce_budget_locked(session_id)
+
+    def reset(self, session_id: str):
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._touch(session_id, time.time())
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            return self._evict_expired_locked(time.time())
+
+
+class SQLiteChatSessionStore(ChatSessionStore):
+    """
+    Session store backed by a SQLite file in WAL mode.
+
+    State survives restarts and is shared by every worker process that
+    points at the same file.
+    """
+
+    # Run the idle/budget sweep at most this often (seconds)
+    sweep_interval = 30.0
+
+    def __init__(self, path: str, *args, **kwargs):
+        """
+        Args:
+            path: Path of the SQLite database file
+            *args, **kwargs: Limits passed to ChatSessionStore
+        """
+        super().__init__(*args, **kwargs)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS chat_sessions ("
+                "  session_id TEXT PRIMARY KEY, last_access REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS chat_sessions_last_access ON chat_sessions (last_access);"
+                "CREATE TABLE IF NOT EXISTS chat_messages ("
+                "  id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,"
+                "  role TEXT NOT NULL, content TEXT NOT NULL, size INTEGER NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS chat_messages_session ON chat_messages (session_id, id);"
+            )
+            self._conn.commit()
+
+    def _touch(self, session_id: str, now: float):
+        # Caller must hold self._lock; creates the session with its system message if missing
+        created = self._conn.execute(
+            "INSERT OR IGNORE INTO chat_sessions (session_id, last_access) VALUES (?, ?)",
+            (session_id, now),
+        ).rowcount
+        if created:
+            self._conn.execute(
+                "INSERT INTO chat_messages (session_id, role, content, size) VALUES (?, ?, ?, ?)",
+                (session_id, "system", self.system_message["content"], _message_size(self.system_message)),
+            )
+        else:
+            self._conn.execute(
+                "UPDATE chat_sessions SET last_access = ? WHERE session_id = ?", (now, session_id)
+            )
+
+    def _delete_sessions(self, session_ids: List[str]):
+        for session_id in session_ids:
+            self._conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+
+    def _sweep(self, now: float, keep_session_id: Optional[str] = None, force: bool = False) -> int:
+        # Caller must hold self._lock
+        if not force and now - self._last_sweep < self.sweep_interval:
+            return 0
+        self._last_sweep = now
+        removed = 0
+
+        if self.idle_ttl_seconds is not None:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT session_id FROM chat_sessions WHERE last_access < ?",
+                (now - self.idle_ttl_seconds,),
+            )]
+            self._delete_sessions(expired)
+            removed += len(expired)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM chat_messages").fetchone()[0]
+        if total > self.max_total_bytes:
+            rows = self._conn.execute(
+                "SELECT s.session_id, COALESCE(SUM(m.size), 0) FROM chat_sessions s "
+                "LEFT JOIN chat_messages m ON m.session_id = s.session_id "
+                "GROUP BY s.session_id ORDER BY s.last_access"
+            ).fetchall()
+            for session_id, size in rows:
+                if total <= self.max_total_bytes:
+                    break
+                if session_id == keep_session_id:
+                    continue
+                self._delete_sessions([session_id])
+                total -= size
+                removed += 1
+        return removed
+
+    def get_messages(self, session_id: str) -> List[Dict[str, str]]:
+        now = time.time()
+        with self._lock:
+            self._sweep(now, keep_session_id=session_id)
+            self._touch(session_id, now)
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT role, content FROM chat_messages WHERE session_id = ? ORDER BY id", (session_id,)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def append_message(self, session_id: str, role: str, content: str):
+        now = time.time()
+        message = {"role": role, "content": content}
+        with self._lock:
+            self._touch(session_id, now)
+            self._conn.execute(
+                "INSERT INTO chat_messages (session_id, role, content, size) VALUES (?, ?, ?, ?)",
+                (session_id, role, content, _message_size(message)),
+            )
+            # Keep the system message plus the most recent turns
+            self._conn.execute(
+                "DELETE FROM chat_messages WHERE session_id = ? AND role != 'system' AND id NOT IN ("
+                "  SELECT id FROM chat_messages WHERE session_id = ? AND role != 'system' "
+                "  ORDER BY id DESC LIMIT ?)",
+                (session_id, session_id, self.max_messages - 1),
+            )
+            self._sweep(now, keep_session_id=session_id)
+            self._conn.commit()
+
+    def reset(self, session_id: str):
+        with self._lock:
+            self._delete_sessions([session_id])
+            self._touch(session_id, time.time())
+            self._conn.commit()
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            removed = self._sweep(time.time(), force=True)
+            self._conn.commit()
+            return removed
+
+
+def create_chat_store(system_message: str) -> ChatSessionStore:
+    """
+    Build the chat session store configured by environment variables.
+
+    CHAT_STORE_BACKEND selects "memory" (default) or "sqlite"; CHAT_STORE_PATH
+    sets the SQLite file. CHAT_MAX_MESSAGES, CHAT_SESSION_TTL and
+    CHAT_MAX_TOTAL_BYTES set the limits.
+
+    Args:
+        system_message: Content of the system message new sessions start with
+
+    Returns:
+        Configured ChatSessionStore
+    """
+    ttl = float(os.getenv("CHAT_SESSION_TTL", "3600"))
+    limits = {
+        "max_messages": int(os.getenv("CHAT_MAX_MESSAGES", "100")),
+        "idle_ttl_seconds": ttl if ttl > 0 else None,
+        "max_total_bytes": int(os.getenv("CHAT_MAX_TOTAL_BYTES", str(50 * 1024 * 1024))),
+    }
+
+    backend = os.getenv("CHAT_STORE_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        path = os.getenv("CHAT_STORE_PATH", ".cache/chat_sessions.db")
+        return SQLiteChatSessionStore(path, system_message, **limits)
+    if backend == "memory":
+        return InMemoryChatSessionStore(system_message, **limits)
+    raise ValueError(f"Unknown CHAT_STORE_BACKEND: {backend}")
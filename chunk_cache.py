@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class SQLiteCacheTier:
+    """
+    On-disk cache tier backed by SQLite so cached chunks survive restarts
+    and are shared by every worker process that points at the same file.
+
+    Writes periodically delete expired entries and the oldest entries past
+    max_rows, so the file stops growing once it is full.
+    """
+
+    # Run the expiry/size sweep at most this often (seconds)
+    sweep_interval = 60.0
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_rows: Optional[int] = 100_000):
+        """
+        Open (or create) the on-disk cache.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl_seconds: Entries older than this are treated as missing (None = never expire)
+            max_rows: Most entries kept on disk; the oldest are deleted first (None = unbounded)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # WAL lets several worker processes read and write the same file concurrently
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS chunk_cache_created_at ON chunk_cache (created_at)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM chunk_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM chunk_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunk_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, now),
+            )
+            if now - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = now
+                self._sweep_locked(now)
+            self._conn.commit()
+
+    def sweep(self) -> int:
+        """
+        Delete expired entries and the oldest entries past max_rows.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._last_sweep = time.time()
+            removed = self._sweep_locked(self._last_sweep)
+            self._conn.commit()
+        return removed
+
+    def _sweep_locked(self, now: float) -> int:
+        # Caller must hold self._lock and commit
+        removed = 0
+        if self.ttl_seconds is not None:
+            removed += self._conn.execute(
+                "DELETE FROM chunk_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+        if self.max_rows is not None:
+            excess = self._conn.execute("SELECT COUNT(*) FROM chunk_cache").fetchone()[0] - self.max_rows
+            if excess > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM chunk_cache WHERE key IN "
+                    "(SELECT key FROM chunk_cache ORDER BY created_at LIMIT ?)", (excess,)
+                ).rowcount
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunk_cache")
+            self._conn.commit()
+
+
+class ChunkCache:
+    """
+    Content-addressed cache for humanized chunks.
+
+    Keys are a hash of the chunk text, iteration number, model and prompt
+    version, so identical work submitted by different requests is only
+    paid for once. Lookups hit an in-memory LRU tier first and fall back to
+    an optional on-disk SQLite tier.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: Optional[float] = 24 * 3600,
+                 disk_path: Optional[str] = None, max_disk_rows: Optional[int] = 100_000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in memory (LRU eviction)
+            ttl_seconds: Time-to-live for entries in both tiers (None = never expire)
+            disk_path: Optional SQLite file for the persistent tier
+            max_disk_rows: Maximum number of entries kept on disk (None = unbounded)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = SQLiteCacheTier(disk_path, ttl_seconds, max_disk_rows) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, iteration: int, model: str, prompt_version: str) -> str:
+        """
+        Build the content-addressed key for a chunk.
+
+        Args:
+            text: Chunk text sent to the model
+            iteration: Iteration number (selects the prompt)
+            model: Model name
+            prompt_version: Version of the prompt templates
+
+        Returns:
+            Hex SHA-256 digest identifying the work
+        """
+        digest = hashlib.sha256()
+        for part in (prompt_version, model, str(iteration), text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key built with make_key
+
+        Returns:
+            Cached text, or None on a miss
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        return self._record_disk_lookup(key, self.disk.get(key) if self.disk else None)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Async version of get; the disk tier is read in a thread so the event loop never waits on SQLite.
+
+        Args:
+            key: Key built with make_key
+
+        Returns:
+            Cached text, or None on a miss
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        return self._record_disk_lookup(key, await asyncio.to_thread(self.disk.get, key) if self.disk else None)
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if self.ttl_seconds is None or now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+        return None
+
+    def _record_disk_lookup(self, key: str, value: Optional[str]) -> Optional[str]:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            # Promote disk hits into the memory tier
+            self._store_memory(key, value, time.time())
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        """
+        Store a result in every tier.
+
+        Args:
+            key: Key built with make_key
+            value: Humanized text
+        """
+        with self._lock:
+            self._store_memory(key, value, time.time())
+        if self.disk:
+            self.disk.set(key, value)
+
+    async def aset(self, key: str, value: str):
+        """
+        Async version of set; the disk tier is written in a thread.
+
+        Args:
+            key: Key built with make_key
+            value: Humanized text
+        """
+        with self._lock:
+            self._store_memory(key, value, time.time())
+        if self.disk:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def _store_memory(self, key: str, value: str, created_at: float):
+        # Caller must hold self._lock
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry from both tiers and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        if self.disk:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return lifetime statistics for the cache.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+
+_default_cache: Optional[ChunkCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[ChunkCache]:
+    """
+    Return the process-wide chunk cache configured from environment variables.
+
+    HUMANIZER_CACHE_SIZE sets the in-memory entry limit (0 disables caching),
+    HUMANIZER_CACHE_TTL the time-to-live in seconds, HUMANIZER_CACHE_PATH
+    enables the persistent SQLite tier and HUMANIZER_CACHE_DISK_ROWS caps
+    its entries (0 = unbounded).
+
+    Returns:
+        Shared ChunkCache, or None when caching is disabled
+    """
+    global _default_cache
+    max_entries = int(os.getenv("HUMANIZER_CACHE_SIZE", "2048"))
+    if max_entries <= 0:
+        return None
+
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                ttl = float(os.getenv("HUMANIZER_CACHE_TTL", str(24 * 3600)))
+                disk_rows = int(os.getenv("HUMANIZER_CACHE_DISK_ROWS", "100000"))
+                _default_cache = ChunkCache(
+                    max_entries=max_entries,
+                    ttl_seconds=ttl if ttl > 0 else None,
+                    disk_path=os.getenv("HUMANIZER_CACHE_PATH") or None,
+                    max_disk_rows=disk_rows if disk_rows > 0 else None,
+                )
+    return _default_cache
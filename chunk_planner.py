@@ -0,0 +1,110 @@
+import math
+from typing import List, NamedTuple, Optional
+
+from model_limits import get_model_limits
+from text_segmenter import SegmentedText, Span
+
+
+class ChunkPlan(NamedTuple):
+    target_words: int
+    min_words: int
+    max_words: int
+
+
+class ChunkPlanner:
+    """
+    Chooses chunk sizes for humanization from model limits and desired parallelism.
+
+    The largest chunk is bounded by what the model can rewrite in one call:
+    the rewrite must fit in the completion budget (with the ±15% length
+    tolerance), and prompt plus rewrite must fit in the context window.
+    Within that bound, the planner aims for about target_parallel_calls
+    chunks per document, so round trips scale with the model and the
+    available concurrency instead of a fixed character count.
+    """
+
+    # Approximate English words per token
+    words_per_token = 0.75
+
+    def __init__(self, model: str, max_completion_tokens: int = 2000, target_parallel_calls: int = 4,
+                 min_words: int = 40, prompt_overhead_tokens: int = 800, length_tolerance: float = 1.15):
+        """
+        Args:
+            model: Groq model the chunks are sent to
+            max_completion_tokens: max_tokens requested per humanization call
+            target_parallel_calls: Desired number of chunks (calls in flight) per document
+            min_words: Smallest chunk worth a round trip (smaller pieces are merged)
+            prompt_overhead_tokens: Tokens used by the system prompt and instructions
+            length_tolerance: Allowed growth of the rewrite relative to the input
+        """
+        limits = get_model_limits(model)
+        completion_tokens = min(max_completion_tokens, limits.max_output_tokens)
+        # Input tokens such that the rewrite still fits in the completion budget ...
+        by_output = completion_tokens / length_tolerance
+        # ... and prompt, input and rewrite together fit in the context window
+        by_context = limits.context_window - prompt_overhead_tokens - completion_tokens
+
+        self.max_words = max(min_words, int(min(by_output, by_context) * self.words_per_token))
+        self.min_words = min_words
+        self.target_parallel_calls = max(1, target_parallel_calls)
+
+    def plan(self, total_words: int) -> ChunkPlan:
+        """
+        Pick the target chunk size for a document.
+
+        Args:
+            total_words: Word count of the whole document
+
+        Returns:
+            ChunkPlan with target, minimum and maximum chunk sizes in words
+        """
+        target = math.ceil(total_words / self.target_parallel_calls)
+        target = max(self.min_words, min(target, self.max_words))
+        return ChunkPlan(target_words=target, min_words=self.min_words, max_words=self.max_words)
+
+    def pack(self, segmented: SegmentedText, plan: ChunkPlan) -> List[Span]:
+        """
+        Pack the paragraphs of a segmented text into chunks of about plan.target_words words.
+
+        Paragraphs longer than the target are split at sentence boundaries,
+        and any sentence still longer than plan.max_words is split at word
+        boundaries. Consecutive pieces are then grouped until the target is
+        reached. A trailing chunk below the minimum is merged into its
+        predecessor. No chunk ever exceeds plan.max_words, so every rewrite
+        fits in one call's completion budget.
+        Pieces are contiguous, so each chunk is a single span of the text
+        (keeping its original separators) and word counts are only added up.
+
+        Args:
+            segmented: Text segmented into paragraph spans
+            plan: Chunk sizes from plan()
+
+        Returns:
+            List of chunk spans in document order
+        """
+        pieces: List[Span] = []
+        for paragraph in segmented.paragraphs:
+            if paragraph.words <= plan.target_words:
+                pieces.append(paragraph)
+            else:
+                for sentence in segmented.sentences(paragraph):
+                    pieces.extend(segmented.word_pieces(sentence, plan.max_words))
+
+        chunks: List[Span] = []
+        current: Optional[Span] = None
+        for piece in pieces:
+            if current and (current.words + piece.words > plan.max_words or
+                            (current.words + piece.words > plan.target_words and current.words >= plan.min_words)):
+                chunks.append(current)
+                current = None
+            if current:
+                current = Span(current.start, piece.end, current.words + piece.words)
+            else:
+                current = piece
+        if current:
+            previous = chunks[-1] if chunks else None
+            if previous and current.words < plan.min_words and previous.words + current.words <= plan.max_words:
+                chunks[-1] = Span(previous.start, current.end, previous.words + current.words)
+            else:
+                chunks.append(current)
+        return chunks
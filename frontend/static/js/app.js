@@ -3,11 +3,14 @@ function app() {
         currentPage: 'humanize',
         prompt: '',
         mode: 'llm_approach',
+        naivePrepass: false,
+        converge: false,
         iterations: 2,
         selectedModel: 'llama-3.3-70b-versatile',
         chatSelectedModel: 'llama-3.3-70b-versatile',
         aiResponse: '',
         humanizedOutput: '',
+        humanizeProgress: '',
         loading: false,
         generating: false,
         chatInput: '',
@@ -30,6 +33,8 @@ function app() {
         get humanizedSectionLabel() {
             if (this.mode === 'llm_approach') {
                 return 'HUMANIZED OUTPUT (LLM Approach)';
+            } else if (this.mode === 'naive_replace') {
+                return 'HUMANIZED OUTPUT (Phrase Replace)';
             } else {
                 return 'HUMANIZED OUTPUT';
             }
@@ -38,19 +43,14 @@ function app() {
         async humanizeText() {
             if (!this.prompt.trim()) return;
             
-            // Check if "Work in Progress" is selected
-            if (this.mode === 'work_in_progress') {
-                alert('This feature is work in progress. Please try the LLM Approach instead.');
-                return;
-            }
-            
-            // Only proceed if LLM Approach is selected
-            if (this.mode !== 'llm_approach') {
+            // Only proceed for supported modes
+            if (this.mode !== 'llm_approach' && this.mode !== 'naive_replace') {
                 return;
             }
             
             this.loading = true;
             this.humanizedOutput = '';
+            this.humanizeProgress = '';
 
             try {
                 const formData = new FormData();
@@ -58,33 +58,73 @@ function app() {
                 formData.append('mode', this.mode);
                 formData.append('model', this.selectedModel);
                 formData.append('iterations', this.iterations);
+                formData.append('naive_prepass', this.naivePrepass);
+                formData.append('converge', this.converge);
                 
                 // Always send the AI response if available for humanization
                 if (this.aiResponse) {
                     formData.append('ai_response', this.aiResponse);
                 }
 
-                const response = await fetch('/humanize', {
+                const response = await fetch('/humanize/stream', {
                     method: 'POST',
                     body: formData
                 });
 
-                const data = await response.json();
-
-                if (data.success) {
-                    // Always put the humanized result on the right side
-                    this.humanizedOutput = data.result;
-                } else {
-                    this.humanizedOutput = `Error: ${data.error}`;
+                // Validation errors come back as a single JSON object instead of a stream
+                if (!response.headers.get('content-type')?.includes('ndjson')) {
+                    const data = await response.json();
+                    this.humanizedOutput = data.success ? data.result : `Error: ${data.error}`;
+                    return;
                 }
+
+                // Chunks can finish out of order, so place each one by its index
+                const chunks = [];
+                let completed = 0;
+                await this.readNdjson(response, (event) => {
+                    if (event.type === 'chunk') {
+                        chunks[event.index] = event.text;
+                        completed++;
+                        this.humanizeProgress = `${completed}/${event.total}`;
+                        this.humanizedOutput = chunks.filter(chunk => chunk !== undefined).join('\n\n');
+                    } else if (event.type === 'done') {
+                        // Always put the humanized result on the right side
+                        this.humanizedOutput = event.result;
+                    } else if (event.type === 'error') {
+                        this.humanizedOutput = `Error: ${event.error}`;
+                    }
+                });
             } catch (error) {
                 console.error('Error:', error);
                 this.humanizedOutput = 'Failed to connect to the server. Please try again.';
             } finally {
                 this.loading = false;
+                this.humanizeProgress = '';
             }
         },
 
+        async readNdjson(response, onEvent) {
+            // Read a newline-delimited JSON stream and call onEvent for every parsed line
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+
+                for (const line of lines) {
+                    if (line.trim()) onEvent(JSON.parse(line));
+                }
+            }
+
+            if (buffer.trim()) onEvent(JSON.parse(buffer));
+        },
+
         async generateResponse() {
             if (!this.prompt.trim()) return;
             
@@ -96,18 +136,27 @@ function app() {
                 formData.append('message', this.prompt);
                 formData.append('model', this.selectedModel);
 
-                const response = await fetch('/chat', {
+                const response = await fetch('/chat/stream', {
                     method: 'POST',
                     body: formData
                 });
 
-                const data = await response.json();
-
-                if (data.success) {
-                    this.aiResponse = data.result;
-                } else {
-                    this.aiResponse = `Error: ${data.error}`;
+                if (!response.headers.get('content-type')?.includes('ndjson')) {
+                    const data = await response.json();
+                    this.aiResponse = data.success ? data.result : `Error: ${data.error}`;
+                    return;
                 }
+
+                // Render tokens as they arrive
+                await this.readNdjson(response, (event) => {
+                    if (event.type === 'token') {
+                        this.aiResponse += event.content;
+                    } else if (event.type === 'done') {
+                        this.aiResponse = event.result;
+                    } else if (event.type === 'error') {
+                        this.aiResponse = `Error: ${event.error}`;
+                    }
+                });
             } catch (error) {
                 console.error('Error:', error);
                 this.aiResponse = 'Network error occurred. Please try again.';
@@ -142,24 +191,39 @@ function app() {
                 formData.append('model', this.chatSelectedModel);
                 formData.append('session_id', this.sessionId);
 
-                const response = await fetch('/chat', {
+                const response = await fetch('/chat/stream', {
                     method: 'POST',
                     body: formData
                 });
 
-                const data = await response.json();
-
-                const assistantMessage = {
+                this.chatMessages.push({
                     id: this.messageId++,
                     type: 'assistant',
-                    content: data.success ? data.result : `Error: ${data.error}`,
+                    content: '',
                     time: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
                     get contentFormatted() {
                         return this.content ? marked.parse(this.content) : this.content || '';
                     }
-                };
+                });
+                // Mutate through the reactive array so Alpine re-renders as tokens arrive
+                const assistantMessage = this.chatMessages[this.chatMessages.length - 1];
 
-                this.chatMessages.push(assistantMessage);
+                if (!response.headers.get('content-type')?.includes('ndjson')) {
+                    const data = await response.json();
+                    assistantMessage.content = data.success ? data.result : `Error: ${data.error}`;
+                    return;
+                }
+
+                await this.readNdjson(response, (event) => {
+                    if (event.type === 'token') {
+                        assistantMessage.content += event.content;
+                        this.scrollToBottom();
+                    } else if (event.type === 'done') {
+                        assistantMessage.content = event.result;
+                    } else if (event.type === 'error') {
+                        assistantMessage.content = `Error: ${event.error}`;
+                    }
+                });
             } catch (error) {
                 console.error('Error:', error);
                 const errorMessage = {
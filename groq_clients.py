@@ -0,0 +1,157 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+# The groq SDK (and httpx under it) is imported when the first client is built,
+# so importing the app stays fast and processes that never call Groq don't pay for it
+if TYPE_CHECKING:
+    import httpx
+    from groq import AsyncGroq, Groq
+
+# Connection pool defaults shared by every client in the registry.
+# Override them through environment variables (read when a client is built).
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+_ClientKey = Tuple[str, str]
+
+_lock = threading.Lock()
+_env_loaded = False
+_sync_clients: Dict[_ClientKey, "Groq"] = {}
+_async_clients: Dict[_ClientKey, "AsyncGroq"] = {}
+
+
+def _pool_limits() -> "httpx.Limits":
+    """
+    Build the connection pool limits used for new clients.
+
+    Returns:
+        httpx.Limits with keep-alive pooling enabled
+    """
+    import httpx
+
+    return httpx.Limits(
+        max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", DEFAULT_MAX_KEEPALIVE_CONNECTIONS)),
+        keepalive_expiry=float(os.getenv("GROQ_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+    )
+
+
+def load_env():
+    """
+    Load variables from a .env file into the environment, once per process.
+
+    Variables that are already set take precedence over the file.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _env_loaded = True
+
+
+def resolve_api_key(api_key: Optional[str] = None) -> str:
+    """
+    Return the API key to use, falling back to GROQ_API_KEY (loading .env if needed).
+
+    Args:
+        api_key: Explicit Groq API key, or None
+
+    Returns:
+        The API key
+
+    Raises:
+        ValueError: If no key is given and GROQ_API_KEY is not set
+    """
+    if not api_key:
+        load_env()
+    api_key = api_key or os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY must be provided or set in environment variables")
+    return api_key
+
+
+def get_groq_client(api_key: Optional[str] = None, model: str = "") -> "Groq":
+    """
+    Return the shared synchronous Groq client for an api_key and model.
+
+    Clients are created once per process and reused, so every caller shares
+    the same keep-alive connection pool instead of paying TLS and connection
+    setup on each request.
+
+    Args:
+        api_key: Groq API key (if None, will try to get from environment)
+        model: Model the client will be used for (each model gets its own pool)
+
+    Returns:
+        Pooled Groq client
+    """
+    key = (resolve_api_key(api_key), model)
+    client = _sync_clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            from groq import DefaultHttpxClient, Groq
+
+            client = Groq(
+                api_key=key[0],
+                # Retries are owned by groq_scheduler so backoff and rate limits stay in one place
+                max_retries=0,
+                http_client=DefaultHttpxClient(limits=_pool_limits()),
+            )
+            _sync_clients[key] = client
+    return client
+
+
+def get_async_groq_client(api_key: Optional[str] = None, model: str = "") -> "AsyncGroq":
+    """
+    Return the shared AsyncGroq client for an api_key and model.
+
+    Args:
+        api_key: Groq API key (if None, will try to get from environment)
+        model: Model the client will be used for (each model gets its own pool)
+
+    Returns:
+        Pooled AsyncGroq client
+    """
+    key = (resolve_api_key(api_key), model)
+    client = _async_clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None:
+            from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+            client = AsyncGroq(
+                api_key=key[0],
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(limits=_pool_limits()),
+            )
+            _async_clients[key] = client
+    return client
+
+
+async def close_all_clients():
+    """
+    Close every pooled client and empty the registry.
+
+    Call this on application shutdown so open connections are released.
+    """
+    with _lock:
+        sync_clients = list(_sync_clients.values())
+        async_clients = list(_async_clients.values())
+        _sync_clients.clear()
+        _async_clients.clear()
+
+    for client in sync_clients:
+        client.close()
+    for client in async_clients:
+        await client.close()
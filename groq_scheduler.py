@@ -0,0 +1,388 @@
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from log_config import get_logger
+from metrics import GROQ_QUEUE_SECONDS, GROQ_REQUEST_SECONDS, GROQ_RETRIES, GROQ_TOKENS
+
+logger = get_logger(__name__)
+
+# Per-model (requests per minute, tokens per minute) budgets. These default to
+# Groq's published free-tier limits; raise them with GROQ_RPM_LIMIT and
+# GROQ_TPM_LIMIT (applied to every model) on paid plans. A limit of 0 disables it.
+DEFAULT_MODEL_LIMITS = {
+    "llama-3.3-70b-versatile": (30, 12000),
+    "llama-3.1-8b-instant": (30, 6000),
+    "gemma2-9b-it": (30, 15000),
+    "meta-llama/llama-4-maverick-17b-128e-instruct": (30, 6000),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (30, 30000),
+}
+FALLBACK_MODEL_LIMITS = (30, 6000)
+
+# HTTP status codes worth retrying besides 429 and 5xx
+RETRYABLE_STATUS_CODES = {408, 409}
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Roughly estimate the prompt tokens of a chat request (about 4 characters per token).
+
+    Args:
+        messages: Chat messages sent to the model
+
+    Returns:
+        Estimated token count
+    """
+    return sum(len(message["content"]) for message in messages) // 4 + 4 * len(messages)
+
+
+class TokenBucket:
+    """
+    Token bucket that refills continuously at a per-minute rate.
+
+    Callers reserve capacity up front and are told how long to wait before
+    using it. The balance may go negative, which queues later callers
+    behind earlier ones. This lets the same bucket serve threads (which
+    sleep) and coroutines (which await) without busy polling.
+    """
+
+    # Whether updates can block (e.g. on a file lock); async callers then run them in a thread
+    blocking = False
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            per_minute: Refill rate in units per minute
+            capacity: Maximum burst size (defaults to one minute of budget)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(per_minute)
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _consume(self, amount: float) -> float:
+        """Refill, take `amount` (negative to refund) and return the new balance."""
+        with self._lock:
+            now = time.monotonic()
+            refilled = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+            self.available = min(self.capacity, refilled - amount)
+            self.updated_at = now
+            return self.available
+
+    def reserve(self, amount: float) -> float:
+        """
+        Reserve capacity and return how long to wait before using it.
+
+        Args:
+            amount: Units to consume (requests or tokens)
+
+        Returns:
+            Seconds to wait (0 when capacity is available now)
+        """
+        # Never reserve more than the burst size, or a single large request would wait forever
+        available = self._consume(min(amount, self.capacity))
+        return 0.0 if available >= 0 else -available / self.rate
+
+    def adjust(self, delta: float):
+        """
+        Correct the balance once the real cost of a call is known.
+
+        Args:
+            delta: Units to additionally consume (negative to refund)
+        """
+        self._consume(delta)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    Token bucket whose balance lives in a SQLite file (WAL mode).
+
+    Every process pointing at the same file draws on one budget, so running
+    several server workers does not multiply the Groq rate limits. Each
+    update is a short write transaction, and wall-clock time is used because
+    monotonic clocks are not comparable across processes.
+    """
+
+    # Waiting for another process's write lock can take a while, so keep it off the event loop
+    blocking = True
+
+    def __init__(self, path: str, name: str, per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            path: Path of the SQLite database file
+            name: Bucket name, unique per model and budget
+            per_minute: Refill rate in units per minute
+            capacity: Maximum burst size (defaults to one minute of budget)
+        """
+        super().__init__(per_minute, capacity)
+        self.path = path
+        self.name = name
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Autocommit mode, so _consume controls its own write transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "  name TEXT PRIMARY KEY, available REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO rate_limit_buckets (name, available, updated_at) VALUES (?, ?, ?)",
+                (name, self.capacity, time.time()),
+            )
+
+    def _consume(self, amount: float) -> float:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so concurrent read-modify-writes serialize
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                available, updated_at = self._conn.execute(
+                    "SELECT available, updated_at FROM rate_limit_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = time.time()
+                refilled = min(self.capacity, available + max(0.0, now - updated_at) * self.rate)
+                available = min(self.capacity, refilled - amount)
+                self._conn.execute(
+                    "UPDATE rate_limit_buckets SET available = ?, updated_at = ? WHERE name = ?",
+                    (available, max(now, updated_at), self.name),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return available
+
+
+class GroqScheduler:
+    """
+    Central gate for Groq calls to one model.
+
+    Every call first waits for room in a requests-per-minute bucket and a
+    tokens-per-minute bucket. Transient failures (429 rate limits, timeouts,
+    connection errors, 5xx) are retried with jittered exponential backoff,
+    and a server-provided retry-after is honoured. If the retries run out,
+    the last error is raised so the caller can fall back and report it.
+    """
+
+    def __init__(self, model: str, requests_per_minute: int, tokens_per_minute: int,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 shared_path: Optional[str] = None):
+        """
+        Args:
+            model: Model the scheduler guards
+            requests_per_minute: Request budget (0 = unlimited)
+            tokens_per_minute: Token budget (0 = unlimited)
+            max_retries: Retries after the first attempt for transient failures
+            base_delay: First backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay
+            shared_path: SQLite file holding budgets shared across processes (None = this process only)
+        """
+        self.model = model
+        self.request_bucket = self._bucket("requests", requests_per_minute, shared_path)
+        self.token_bucket = self._bucket("tokens", tokens_per_minute, shared_path)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _bucket(self, kind: str, per_minute: int, shared_path: Optional[str]) -> Optional[TokenBucket]:
+        if per_minute <= 0:
+            return None
+        if shared_path:
+            return SQLiteTokenBucket(shared_path, f"{self.model}:{kind}", per_minute)
+        return TokenBucket(per_minute)
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = 0.0
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket:
+            wait = max(wait, self.token_bucket.reserve(estimated_tokens))
+        return wait
+
+    async def _run_bucket_update(self, fn: Callable[..., Any], *args) -> Any:
+        # Shared (SQLite) buckets can wait on other processes' write locks; run them in a thread
+        if any(bucket is not None and bucket.blocking for bucket in (self.request_bucket, self.token_bucket)):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def _reconcile(self, result: Any, estimated_tokens: int):
+        # Replace the estimate with the real usage reported by the API
+        usage = getattr(result, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if self.token_bucket and isinstance(total_tokens, int):
+            self.token_bucket.adjust(total_tokens - estimated_tokens)
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if isinstance(tokens, int):
+                GROQ_TOKENS.inc(tokens, model=self.model, type=kind)
+
+    def _refund(self, estimated_tokens: int):
+        # A failed attempt (429, 5xx, connection error) used no completion tokens; give the
+        # estimate back so each retry's new reservation does not drain the budget
+        if self.token_bucket and estimated_tokens:
+            self.token_bucket.adjust(-estimated_tokens)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        # Already imported by the client that raised the error
+        import groq
+
+        if isinstance(error, (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)):
+            return True
+        if isinstance(error, groq.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+        return False
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Read the server's retry-after hint (in seconds) from an API error, if present."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000.0
+            except ValueError:
+                pass
+
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                return None
+        return None
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            # Small jitter so waiting callers don't all retry in the same instant
+            return retry_after + random.uniform(0, 0.25)
+        # Full jitter exponential backoff
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _log_retry(self, attempt: int, delay: float, error: Exception):
+        GROQ_RETRIES.inc(model=self.model, error=type(error).__name__)
+        logger.warning(
+            "Retry %d/%d in %.1fs after %s", attempt + 1, self.max_retries, delay, type(error).__name__,
+            extra={"model": self.model}
+        )
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+        """
+        Run a synchronous Groq call under the rate limits with retries.
+
+        Args:
+            fn: Zero-argument callable performing the API call
+            estimated_tokens: Expected prompt + completion tokens for the call
+
+        Returns:
+            Whatever fn returns
+        """
+        attempt = 0
+        while True:
+            wait = self._reserve(estimated_tokens)
+            GROQ_QUEUE_SECONDS.observe(wait, model=self.model)
+            if wait > 0:
+                time.sleep(wait)
+            started = time.perf_counter()
+            try:
+                result = fn()
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, model=self.model, status="ok")
+                self._reconcile(result, estimated_tokens)
+                return result
+            except Exception as e:
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, model=self.model, status=type(e).__name__)
+                self._refund(estimated_tokens)
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                self._log_retry(attempt, delay, e)
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> Any:
+        """
+        Async version of call; fn must return an awaitable.
+
+        Args:
+            fn: Zero-argument callable returning the API call coroutine
+            estimated_tokens: Expected prompt + completion tokens for the call
+
+        Returns:
+            Whatever the awaited call returns
+        """
+        attempt = 0
+        while True:
+            wait = await self._run_bucket_update(self._reserve, estimated_tokens)
+            GROQ_QUEUE_SECONDS.observe(wait, model=self.model)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            started = time.perf_counter()
+            try:
+                result = await fn()
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, model=self.model, status="ok")
+                await self._run_bucket_update(self._reconcile, result, estimated_tokens)
+                return result
+            except Exception as e:
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, model=self.model, status=type(e).__name__)
+                await self._run_bucket_update(self._refund, estimated_tokens)
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                self._log_retry(attempt, delay, e)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+_schedulers: Dict[str, GroqScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def _model_limits(model: str):
+    rpm, tpm = DEFAULT_MODEL_LIMITS.get(model, FALLBACK_MODEL_LIMITS)
+    rpm = int(os.getenv("GROQ_RPM_LIMIT", rpm))
+    tpm = int(os.getenv("GROQ_TPM_LIMIT", tpm))
+    return rpm, tpm
+
+
+def get_scheduler(model: str) -> GroqScheduler:
+    """
+    Return the process-wide scheduler for a model.
+
+    When GROQ_RATE_LIMIT_PATH is set, the budgets are kept in that SQLite
+    file and shared with every other process using it.
+
+    Args:
+        model: Groq model name
+
+    Returns:
+        Shared GroqScheduler enforcing that model's budgets
+    """
+    scheduler = _schedulers.get(model)
+    if scheduler is not None:
+        return scheduler
+
+    with _schedulers_lock:
+        scheduler = _schedulers.get(model)
+        if scheduler is None:
+            rpm, tpm = _model_limits(model)
+            scheduler = GroqScheduler(
+                model,
+                requests_per_minute=rpm,
+                tokens_per_minute=tpm,
+                max_retries=int(os.getenv("GROQ_MAX_RETRIES", "4")),
+                shared_path=os.getenv("GROQ_RATE_LIMIT_PATH") or None,
+            )
+            _schedulers[model] = scheduler
+    return scheduler
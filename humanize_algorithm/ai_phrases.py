@@ -0,0 +1,90 @@
+# Phrases that mark text as AI-generated. The humanization prompts quote the
+# first entries of this list, and the phrase detector scores text against all of it.
+COMMON_AI_PHRASES = [
+    "as an AI language model",
+    "I'm sorry, but",
+    "it is important to note that",
+    "in conclusion",
+    "here are some key points",
+    "delve into",
+    "in the realm of",
+    "plays a crucial role",
+    "gain valuable insights",
+    "embark on your journey",
+    "seamlessly integrated",
+    "innovative solutions",
+    "elevate your experience",
+    "unlock the potential",
+    "fostering a culture of",
+    # Most prevalent AI phrases based on 2024-2025 research (50 phrases)
+    "today's fast-paced world",
+    "notable works include",
+    "aims to explore",
+    "aligns with",
+    "surpassing expectations",
+    "tragically",
+    "making an impact",
+    "research needed to understand",
+    "despite facing",
+    "expressed excitement",
+    "evolving situation",
+    "at its core",
+    "to put it simply",
+    "this underscores the importance of",
+    "a key takeaway is",
+    "that being said",
+    "from a broader perspective",
+    "generally speaking",
+    "typically",
+    "tends to",
+    "arguably",
+    "to some extent",
+    "broadly speaking",
+    "shed light on",
+    "facilitate",
+    "refine",
+    "bolster",
+    "differentiate",
+    "streamline",
+    "revolutionize",
+    "cutting-edge",
+    "game-changing",
+    "transformative",
+    "seamless integration",
+    "excitingly",
+    "amazing",
+    "remarkable",
+    "revolutionize the way",
+    "transformative power",
+    "groundbreaking advancement",
+    "pushing the boundaries",
+    "only time will tell",
+    "rapid pace of development",
+    "bringing us one step closer",
+    "paving the way",
+    "significantly enhances",
+    "aims to democratize",
+    "continues to progress rapidly",
+    "exciting opportunities",
+    "opens up exciting possibilities",
+    "unleashing the potential",
+    "exploring new frontiers",
+    "underscore",
+    "pivotal",
+    "harness",
+    "illuminate",
+    "unlock the secrets",
+    "unveil the secrets",
+    "take a dive into",
+    "in today's digital era",
+    "in summary",
+    "profound",
+    "supercharge",
+    "evolve",
+    "reimagine",
+    "navigate",
+    "moreover",
+    "therefore",
+    "alternatively",
+    "specifically"
+]
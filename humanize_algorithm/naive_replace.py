@@ -2,16 +2,115 @@ import json
 import random
 import re
 import os
+from functools import lru_cache
 
-# Read the JSON mapping from file using a path relative to this script
+# The JSON mapping lives next to this script and is only read when first needed
 json_path = os.path.join(os.path.dirname(__file__), 'naive_humanize_replace_map.json')
-with open(json_path, 'r') as f:
-    naive_humanize_replace_map = json.load(f)
+
+
+@lru_cache(maxsize=1)
+def load_replace_map():
+    """
+    Reads the bundled replace map (once per process).
+    Returns:
+        dict: Mapping of phrases to their humanized versions.
+    """
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+
+def __getattr__(name):
+    # Keeps `naive_humanize_replace_map` importable without loading it at import time
+    if name == 'naive_humanize_replace_map':
+        return load_replace_map()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _build_trie_pattern(keys):
+    """
+    Build a regex that matches any of the keys, factored into a prefix trie.
+    
+    Shared prefixes are matched once, so the regex engine does a near-linear
+    scan instead of trying every key at every position. Optional groups are
+    greedy, so the longest key starting at a position always wins.
+    Args:
+        keys (iterable): Phrases to match literally.
+    Returns:
+        str: Regex source matching any key.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[''] = True  # End-of-key marker
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A key may end here, so the longer continuations are optional
+        return '(?:' + body + ')?' if '' in node else body
+
+    return render(trie)
+
+
+class NaiveReplacer:
+    """
+    Prebuilt phrase replacement engine.
+    
+    The replace map is compiled once into a single regex, and every phrase
+    is replaced in one linear scan of the text. At each position the longest
+    matching phrase wins.
+    """
+
+    def __init__(self, replace_map):
+        """
+        Args:
+            replace_map (dict): Mapping of phrases to their humanized versions.
+        """
+        self.replace_map = dict(replace_map)
+        keys = [key for key in self.replace_map if key]
+        self.pattern = re.compile(_build_trie_pattern(keys)) if keys else None
+
+    def humanize(self, text, replace_rate=0.8, rng=None):
+        """
+        Replaces phrases in the input text in a single pass.
+        Each phrase occurrence is replaced with probability replace_rate.
+        Args:
+            text (str): The input text to humanize.
+            replace_rate (float): Probability of replacing a detected phrase (0 to 1).
+            rng (random.Random): Optional random generator (for reproducible output).
+        Returns:
+            tuple: (humanized_text, num_replacements, replacements_dict)
+        """
+        if self.pattern is None or not text:
+            return text, 0, {}
+
+        rand = (rng or random).random
+        replacements = {}
+
+        def repl(m):
+            phrase = m.group(0)
+            if rand() < replace_rate:
+                replacements[phrase] = replacements.get(phrase, 0) + 1
+                return self.replace_map[phrase]
+            return phrase
+
+        text = self.pattern.sub(repl, text)
+        return text, sum(replacements.values()), replacements
+
+
+@lru_cache(maxsize=8)
+def _get_replacer(replace_items):
+    return NaiveReplacer(dict(replace_items))
+
 
 def naive_humanize_1(replace_map, text, replace_rate=0.8):
     """
     Replaces phrases in the input text according to the replace_map.
     Each phrase is replaced with probability replace_rate.
+    The compiled engine for a given map is built once and reused.
     Args:
         replace_map (dict): Mapping of phrases to their humanized versions.
         text (str): The input text to humanize.
@@ -19,34 +118,37 @@ def naive_humanize_1(replace_map, text, replace_rate=0.8):
     Returns:
         tuple: (humanized_text, num_replacements, replacements_dict)
     """
+    replacer = _get_replacer(tuple(replace_map.items()))
+    return replacer.humanize(text, replace_rate)
 
-    sorted_keys = sorted(replace_map.keys(), key=len, reverse=True)
-    replacements = {}
-    total_replacements = 0
 
-    for key in sorted_keys:
-        pattern = re.escape(key)
-        # Find all matches
-        matches = list(re.finditer(pattern, text))
-        count = 0
-        # Replace with probability
-        def repl(m):
-            nonlocal count
-            if random.random() < replace_rate:
-                count += 1
-                return replace_map[key]
-            else:
-                return m.group(0)
-        text = re.sub(pattern, repl, text)
-        if count > 0:
-            replacements[key] = count
-            total_replacements += count
-    return text, total_replacements, replacements
-
-
-result_text, num_replacements, replacements = naive_humanize_1(
-    naive_humanize_replace_map,
-    """The Importance of Gender Sensitization: Breaking Down Barriers and Building a More Inclusive Society
+def get_default_replacer():
+    """
+    Returns the shared engine built from naive_humanize_replace_map.json.
+    Returns:
+        NaiveReplacer: Engine compiled from the bundled replace map.
+    """
+    return _get_replacer(tuple(load_replace_map().items()))
+
+
+def naive_humanize(text, replace_rate=0.8, rng=None):
+    """
+    Humanizes text locally with the bundled replace map (no API calls).
+    Args:
+        text (str): The input text to humanize.
+        replace_rate (float): Probability of replacing a detected phrase (0 to 1).
+        rng (random.Random): Optional random generator (for reproducible output).
+    Returns:
+        tuple: (humanized_text, num_replacements, replacements_dict)
+    """
+    return get_default_replacer().humanize(text, replace_rate, rng)
+
+
+def main():
+    """Runs the replacer on a sample essay and prints what it changed."""
+    result_text, num_replacements, replacements = naive_humanize_1(
+        load_replace_map(),
+        """The Importance of Gender Sensitization: Breaking Down Barriers and Building a More Inclusive Society
 
 In today's world, gender equality is a fundamental human right that is still not fully realized. Despite progress in many areas, women and marginalized gender groups continue to face significant barriers and biases that prevent them from achieving their full potential. This is where gender sensitization comes in – a crucial process that aims to raise awareness and challenge societal norms, attitudes, and behaviors that perpetuate gender-based discrimination.
 
@@ -86,10 +188,14 @@ Conclusion
 In conclusion, gender sensitization is a critical process that is essential for promoting gender equality and challenging societal norms and attitudes that perpetuate discrimination. By educating individuals, promoting policy reforms, engaging with communities, and modeling respectful behavior, we can create a more inclusive and equitable society for all. While there are challenges to be addressed, there are also many opportunities for promoting gender sensitization and driving positive change. Ultimately, gender sensitization is a journey that requires commitment, dedication, and collective effort, but the rewards are well worth it – a more just, equitable, and peaceful world for all.
 
 """
-)
+    )
+
+    print(result_text)
+    print(f"\nTotal replacements: {num_replacements}")
+    print("Replacements made:")
+    for k, v in replacements.items():
+        print(f"'{k}' -> {v} time(s)")
+
 
-print(result_text)
-print(f"\nTotal replacements: {num_replacements}")
-print("Replacements made:")
-for k, v in replacements.items():
-    print(f"'{k}' -> {v} time(s)")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
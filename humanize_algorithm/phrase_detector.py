@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple
+
+from humanize_algorithm.ai_phrases import COMMON_AI_PHRASES
+from humanize_algorithm.naive_replace import _build_trie_pattern
+
+
+class PhraseScore(NamedTuple):
+    hits: Dict[str, int]
+    total_hits: int
+    words: int
+    hits_per_1000_words: float
+
+
+class AIPhraseDetector:
+    """
+    Prebuilt matcher for AI-sounding phrases.
+
+    All phrases are compiled once into a single case-insensitive regex
+    (factored into a prefix trie) that only matches whole words, so a text
+    is scored in one linear scan. At each position the longest matching
+    phrase wins.
+    """
+
+    def __init__(self, phrases):
+        """
+        Args:
+            phrases (iterable): Phrases to detect (matched case-insensitively).
+        """
+        self.phrases = sorted({phrase.lower() for phrase in phrases if phrase.strip()})
+        if self.phrases:
+            # Straight apostrophes in phrases also match typographic ones ("today’s")
+            body = _build_trie_pattern(self.phrases).replace("'", "['’]")
+            # Lookarounds instead of \b, so phrases starting or ending in punctuation still match
+            self.pattern = re.compile(r'(?<!\w)(?:' + body + r')(?!\w)', re.IGNORECASE)
+        else:
+            self.pattern = None
+
+    def score(self, text):
+        """
+        Counts the phrases found in a text.
+        Args:
+            text (str): Text to score.
+        Returns:
+            PhraseScore: Hits per phrase (lowercased), total hits, word count and hits per 1000 words.
+        """
+        hits = {}
+        if self.pattern is not None and text:
+            for match in self.pattern.finditer(text):
+                phrase = match.group(0).lower().replace("’", "'")
+                hits[phrase] = hits.get(phrase, 0) + 1
+        total_hits = sum(hits.values())
+        words = len(text.split()) if text else 0
+        density = round(total_hits * 1000 / words, 2) if words else 0.0
+        return PhraseScore(hits, total_hits, words, density)
+
+    def score_chunks(self, chunks):
+        """
+        Scores each chunk of a document separately.
+        Args:
+            chunks (list): Chunk strings.
+        Returns:
+            list: PhraseScore per chunk, in order.
+        """
+        return [self.score(chunk) for chunk in chunks]
+
+
+@lru_cache(maxsize=8)
+def _get_detector(phrases):
+    return AIPhraseDetector(phrases)
+
+
+def get_default_detector():
+    """
+    Returns the shared detector built from the full COMMON_AI_PHRASES list.
+    Returns:
+        AIPhraseDetector: Detector compiled from the bundled phrase list.
+    """
+    return _get_detector(tuple(COMMON_AI_PHRASES))
+
+
+def score_ai_phrases(text):
+    """
+    Scores text against the bundled AI phrase list (no API calls).
+    Args:
+        text (str): Text to score.
+    Returns:
+        PhraseScore: Hits per phrase, total hits, word count and hits per 1000 words.
+    """
+    return get_default_detector().score(text)
@@ -1,12 +1,35 @@
-import os
 import re
-from typing import List, Optional
-from groq import Groq
-from dotenv import load_dotenv
-import sys
-from datetime import datetime
+import logging
+from typing import AbstractSet, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from groq_clients import get_async_groq_client, get_groq_client, load_env, resolve_api_key
+from chunk_cache import ChunkCache, get_default_cache
+from groq_scheduler import estimate_tokens, get_scheduler
+from single_flight import get_default_single_flight
+from chunk_planner import ChunkPlanner
+from text_segmenter import SegmentedText, Span
+from prompt_templates import build_system_prompt, iteration_tier
+from humanize_algorithm.ai_phrases import COMMON_AI_PHRASES
+from humanize_algorithm.naive_replace import naive_humanize
+from humanize_algorithm.phrase_detector import get_default_detector
+from log_config import get_logger
+from metrics import (HUMANIZER_CACHE_LOOKUPS, HUMANIZER_CALL_SECONDS, HUMANIZER_FALLBACKS,
+                     HUMANIZER_ITERATIONS_SKIPPED, HUMANIZER_STAGE_SECONDS)
 
-load_dotenv()
+logger = get_logger(__name__)
+
+
+class ConvergenceCriteria(NamedTuple):
+    """Local checks a chunk must pass to skip its remaining iterations."""
+    # Maximum relative word-count change from the chunk's original text
+    max_word_drift: float = 0.15
+    # Maximum number of AI-sounding phrases left in the chunk
+    max_phrase_hits: int = 0
+    # Minimum Flesch Reading Ease score
+    min_reading_ease: float = 60.0
 
 def sanitize_unicode_text(text: str) -> str:
     """
@@ -40,97 +63,20 @@ class HumanizeTextWithGroq:
     Processes text paragraph by paragraph with multiple iterations for better humanization.
     """
     
+    # max_tokens requested for each paragraph rewrite
+    max_completion_tokens = 2000
+    
+    # Bump whenever the prompts change so cached results from older prompts are not reused
+    prompt_version = "1"
+    
     # Common AI phrases to avoid during humanization
-    common_ai_phrases_to_avoid = [
-        "as an AI language model",
-        "I'm sorry, but",
-        "it is important to note that",
-        "in conclusion",
-        "here are some key points",
-        "delve into",
-        "in the realm of",
-        "plays a crucial role",
-        "gain valuable insights",
-        "embark on your journey",
-        "seamlessly integrated",
-        "innovative solutions",
-        "elevate your experience",
-        "unlock the potential",
-        "fostering a culture of",
-        # Most prevalent AI phrases based on 2024-2025 research (50 phrases)
-        "today's fast-paced world",
-        "notable works include",
-        "aims to explore",
-        "aligns with",
-        "surpassing expectations",
-        "tragically",
-        "making an impact",
-        "research needed to understand",
-        "despite facing",
-        "expressed excitement",
-        "evolving situation",
-        "at its core",
-        "to put it simply",
-        "this underscores the importance of",
-        "a key takeaway is",
-        "that being said",
-        "from a broader perspective",
-        "generally speaking",
-        "typically",
-        "tends to",
-        "arguably",
-        "to some extent",
-        "broadly speaking",
-        "shed light on",
-        "facilitate",
-        "refine",
-        "bolster",
-        "differentiate",
-        "streamline",
-        "revolutionize",
-        "cutting-edge",
-        "game-changing",
-        "transformative",
-        "seamless integration",
-        "excitingly",
-        "amazing",
-        "remarkable",
-        "revolutionize the way",
-        "transformative power",
-        "groundbreaking advancement",
-        "pushing the boundaries",
-        "only time will tell",
-        "rapid pace of development",
-        "bringing us one step closer",
-        "paving the way",
-        "significantly enhances",
-        "aims to democratize",
-        "continues to progress rapidly",
-        "exciting opportunities",
-        "opens up exciting possibilities",
-        "unleashing the potential",
-        "exploring new frontiers",
-        "underscore",
-        "pivotal",
-        "harness",
-        "illuminate",
-        "unlock the secrets",
-        "unveil the secrets",
-        "take a dive into",
-        "in today's digital era",
-        "in summary",
-        "profound",
-        "supercharge",
-        "evolve",
-        "reimagine",
-        "navigate",
-        "moreover",
-        "therefore",
-        "alternatively",
-        "specifically"
-    ]
-    
-    def __init__(self, api_key: Optional[str] = None, model: str = "llama-3.3-70b-versatile", last_pass: bool = False):
+    common_ai_phrases_to_avoid = COMMON_AI_PHRASES
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "llama-3.3-70b-versatile", last_pass: bool = False,
+                 max_concurrency: int = 4, cache: Optional[ChunkCache] = None, use_cache: bool = True,
+                 naive_prepass: bool = False, target_parallel_calls: Optional[int] = None,
+                 converge: bool = False, convergence_criteria: Optional[ConvergenceCriteria] = None,
+                 coalesce: bool = True):
         """
         Initialize the humanizer with Groq API.
         
@@ -138,143 +84,106 @@ class HumanizeTextWithGroq:
             api_key: Groq API key (if None, will try to get from environment)
             model: Groq model to use for humanization
             last_pass: Whether to perform a final coherence pass on the entire text (default: True)
+            max_concurrency: Maximum number of chunks humanized in parallel (1 = strictly sequential)
+            cache: Chunk result cache (defaults to the shared process-wide cache)
+            use_cache: Whether to reuse cached results for identical chunks
+            naive_prepass: Run the local phrase-replacement engine before the LLM iterations
+            target_parallel_calls: Desired chunks per document (defaults to max_concurrency)
+            converge: Stop iterating a chunk as soon as it passes the local quality checks
+            convergence_criteria: Thresholds for converge (defaults to ConvergenceCriteria())
+            coalesce: Share one API call between concurrent requests for the same chunk and iteration
         """
-        self.api_key = api_key or os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            raise ValueError("GROQ_API_KEY must be provided or set in environment variables")
-        
-        self.client = Groq(api_key=self.api_key)
+        # Falls back to GROQ_API_KEY (loading .env if needed); raises ValueError if neither is set
+        self.api_key = resolve_api_key(api_key)
         self.model = model
         self.last_pass = last_pass
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = (cache or get_default_cache()) if use_cache else None
+        self.single_flight = get_default_single_flight() if coalesce else None
+        self.naive_prepass = naive_prepass
+        self.converge = converge
+        self.convergence_criteria = convergence_criteria or ConvergenceCriteria()
+        # Hashable snapshot of the avoid-list, part of the system prompt cache key
+        self._ai_phrases = tuple(self.common_ai_phrases_to_avoid)
+        # Chunk sizes follow the model's limits and the number of calls we can run in parallel
+        self.chunk_planner = ChunkPlanner(
+            model,
+            max_completion_tokens=self.max_completion_tokens,
+            target_parallel_calls=target_parallel_calls or self.max_concurrency
+        )
+        
+        # Per-run cache statistics (reset at the start of each humanize call)
+        self._stats_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fallbacks: List[Dict] = []
+        self.run_metrics: Dict[str, float] = self._empty_run_metrics()
+        self._run_started = 0.0
     
-    def _detect_paragraphs(self, text: str) -> List[str]:
+    @property
+    def client(self):
+        """Pooled synchronous Groq client, created on first use."""
+        # Clients come from the process-wide registry so connection pools are shared across instances
+        return get_groq_client(self.api_key, self.model)
+    
+    @property
+    def async_client(self):
+        """Pooled AsyncGroq client, created on first use."""
+        return get_async_groq_client(self.api_key, self.model)
+    
+    def _detect_chunks(self, text: str) -> List[Tuple[str, Span]]:
         """
-        Detect paragraphs in the text and ensure minimum chunk sizes.
-        Merges small chunks (≤20 words) with neighboring chunks.
+        Detect paragraphs in the text and pack them into chunks.
+        
+        The text is segmented once into paragraph and sentence spans with
+        precomputed word counts. Chunk sizes come from the ChunkPlanner: long
+        paragraphs are split at sentence boundaries and small ones are merged
+        with their neighbours, aiming for about target_parallel_calls chunks
+        within the model's limits.
         
         Args:
             text: Input text to split into paragraphs
             
         Returns:
-            List of paragraph strings with minimum 20 words each
+            List of (chunk text, span) tuples; spans index into the stripped text
         """
         # Clean up the text first
         text = text.strip()
         
-        # Log initial detection
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"[{timestamp}] 🔍 Starting paragraph detection and chunking...")
-        
-        # Split by double newlines first (most common paragraph separator)
-        initial_paragraphs = re.split(r'\n\s*\n', text)
-        
-        # If no double newlines found, split by single newlines
-        if len(initial_paragraphs) == 1:
-            initial_paragraphs = text.split('\n')
-        
-        # Clean and filter empty paragraphs
-        initial_paragraphs = [p.strip() for p in initial_paragraphs if p.strip()]
-        
-        print(f"[{timestamp}] 📄 Found {len(initial_paragraphs)} initial paragraphs")
-        
-        # Log paragraph sizes
-        for i, para in enumerate(initial_paragraphs):
-            word_count = self._count_words(para)
-            print(f"[{timestamp}]   Paragraph {i+1}: {word_count} words")
-        
-        # Split very long paragraphs (more than 500 characters) at sentence boundaries
-        split_paragraphs = []
-        for para in initial_paragraphs:
-            if len(para) > 500:
-                # Split by periods followed by space and capital letter (sentence boundaries)
-                sentences = re.split(r'(?<=\.)\s+(?=[A-Z])', para)
-                
-                # Group sentences into chunks (targeting ~300 chars but ensuring word count minimums)
-                current_chunk = ""
-                for sentence in sentences:
-                    test_chunk = current_chunk + sentence + " "
-                    
-                    # If adding this sentence makes it too long AND current chunk has enough words
-                    if (len(test_chunk) > 300 and 
-                        current_chunk.strip() and 
-                        self._count_words(current_chunk) >= 20):
-                        split_paragraphs.append(current_chunk.strip())
-                        current_chunk = sentence + " "
-                    else:
-                        current_chunk = test_chunk
-                
-                if current_chunk.strip():
-                    split_paragraphs.append(current_chunk.strip())
-            else:
-                split_paragraphs.append(para)
+        segmented = SegmentedText(text)
+        
+        # Log paragraph sizes (only when debug logging is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, para in enumerate(segmented.paragraphs):
+                logger.debug("Paragraph %d: %d words", i + 1, para.words, extra={"sampled": True})
         
-        # Now merge small chunks (≤20 words) with neighboring chunks
-        final_chunks = self._merge_small_chunks(split_paragraphs)
+        # Size chunks for this document, then split long paragraphs and merge small ones
+        plan = self.chunk_planner.plan(segmented.total_words)
+        spans = self.chunk_planner.pack(segmented, plan)
         
-        # Log final chunk information
-        print(f"[{timestamp}] ✅ Final chunking complete: {len(final_chunks)} chunks")
-        for i, chunk in enumerate(final_chunks):
-            word_count = self._count_words(chunk)
-            print(f"[{timestamp}]   Chunk {i+1}: {word_count} words")
+        logger.info(
+            "Chunked %d paragraphs into %d chunks (~%d words each)",
+            len(segmented.paragraphs), len(spans), plan.target_words,
+            extra={"paragraphs": len(segmented.paragraphs), "chunks": len(spans), "target_words": plan.target_words,
+                   "min_words": plan.min_words, "max_words": plan.max_words}
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, span in enumerate(spans):
+                logger.debug("Chunk %d: %d words", i + 1, span.words, extra={"sampled": True})
         
-        return final_chunks
+        return [(segmented.slice(span), span) for span in spans]
     
-    def _merge_small_chunks(self, paragraphs: List[str]) -> List[str]:
+    def _detect_paragraphs(self, text: str) -> List[str]:
         """
-        Merge chunks with ≤20 words with neighboring chunks.
+        Detect paragraphs in the text and pack them into chunks.
         
         Args:
-            paragraphs: List of paragraph strings
+            text: Input text to split into paragraphs
             
         Returns:
-            List of merged paragraphs with minimum 20 words each
+            List of chunk strings
         """
-        if not paragraphs:
-            return []
-        
-        # If only one paragraph, return it regardless of size
-        if len(paragraphs) == 1:
-            return paragraphs
-        
-        merged_chunks = []
-        i = 0
-        
-        while i < len(paragraphs):
-            current_chunk = paragraphs[i]
-            current_word_count = self._count_words(current_chunk)
-            
-            # If current chunk is too small, try to merge it
-            if current_word_count <= 20:
-                # Try to merge with next chunk first (if exists)
-                if i + 1 < len(paragraphs):
-                    next_chunk = paragraphs[i + 1]
-                    merged = current_chunk + "\n\n" + next_chunk
-                    merged_word_count = self._count_words(merged)
-                    
-                    # If merged chunk is reasonable size (not too big), merge them
-                    if merged_word_count <= 150:  # Reasonable upper limit
-                        merged_chunks.append(merged)
-                        i += 2  # Skip both chunks as they're now merged
-                        continue
-                
-                # If can't merge with next, try to merge with previous (if exists and it's the last chunk)
-                if merged_chunks and i == len(paragraphs) - 1:
-                    # Merge with the last chunk in merged_chunks
-                    last_chunk = merged_chunks.pop()
-                    merged = last_chunk + "\n\n" + current_chunk
-                    merged_chunks.append(merged)
-                    i += 1
-                    continue
-                
-                # If can't merge, keep it anyway (edge case)
-                merged_chunks.append(current_chunk)
-                i += 1
-            else:
-                # Chunk is large enough, keep it as is
-                merged_chunks.append(current_chunk)
-                i += 1
-        
-        return merged_chunks
+        return [chunk for chunk, _ in self._detect_chunks(text)]
     
     def _count_words(self, text: str) -> int:
         """
@@ -288,106 +197,309 @@ class HumanizeTextWithGroq:
         """
         return len(text.strip().split())
     
-    def _get_ai_phrases_warning(self) -> str:
+    def _system_prompt(self, tier: str) -> str:
+        """
+        Return the precomputed system prompt for a tier and this instance's model.
+        
+        Args:
+            tier: "iteration_1", "iteration_2", "iteration_3" or "final_pass"
+            
+        Returns:
+            System prompt text (built once per tier, model and phrase list)
+        """
+        return build_system_prompt(tier, self.model, self._ai_phrases)
+    
+    def _build_paragraph_messages(self, paragraph: str, iteration: int = 1) -> List[Dict[str, str]]:
+        """
+        Build the chat messages used to humanize a single paragraph.
+        
+        Args:
+            paragraph: Paragraph text to humanize
+            iteration: Current iteration number (affects the prompt strategy)
+            
+        Returns:
+            List of system and user messages for the chat completions API
+        """
+        # Different prompts for different iterations; only the user prompt changes per chunk
+        system_prompt = self._system_prompt(iteration_tier(iteration))
+        
+        original_word_count = self._count_words(paragraph)
+        user_prompt = f"Please humanize this text according to the guidelines above. Original word count: {original_word_count} words. Target word count: {original_word_count} words (±15% tolerance = {int(original_word_count * 0.85)}-{int(original_word_count * 1.15)} words).\n\n{paragraph}"
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _cache_lookup(self, paragraph: str, iteration: int):
+        """
+        Look up a chunk result in the cache and record the hit or miss.
+        
+        Args:
+            paragraph: Paragraph text to humanize
+            iteration: Current iteration number
+            
+        Returns:
+            Tuple of (cache key, cached text or None); the key is None when caching is off
+        """
+        if self.cache is None:
+            return None, None
+        
+        key = ChunkCache.make_key(paragraph, iteration, self.model, self.prompt_version)
+        return key, self._record_cache_lookup(iteration, self.cache.get(key))
+    
+    async def _acache_lookup(self, paragraph: str, iteration: int):
+        """
+        Async version of _cache_lookup; the disk tier is read without blocking the event loop.
+        
+        Args:
+            paragraph: Paragraph text to humanize
+            iteration: Current iteration number
+            
+        Returns:
+            Tuple of (cache key, cached text or None); the key is None when caching is off
+        """
+        if self.cache is None:
+            return None, None
+        
+        key = ChunkCache.make_key(paragraph, iteration, self.model, self.prompt_version)
+        return key, self._record_cache_lookup(iteration, await self.cache.aget(key))
+    
+    def _record_cache_lookup(self, iteration: int, cached: Optional[str]) -> Optional[str]:
+        """Count a cache hit or miss in the metrics and the run statistics."""
+        HUMANIZER_CACHE_LOOKUPS.inc(model=self.model, iteration=iteration, result="miss" if cached is None else "hit")
+        with self._stats_lock:
+            if cached is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+        return cached
+    
+    def _flight_key(self, paragraph: str, iteration: int, cache_key: Optional[str]) -> str:
+        """Key identifying a chunk call for coalescing (the cache key when caching is on)."""
+        return cache_key or ChunkCache.make_key(paragraph, iteration, self.model, self.prompt_version)
+    
+    @staticmethod
+    def _empty_run_metrics() -> Dict[str, float]:
+        return {
+            "chunking_seconds": 0.0,
+            "humanize_seconds": 0.0,
+            "api_calls": 0,
+            "api_seconds": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "iterations_skipped": 0,
+            "coalesced_calls": 0
+        }
+    
+    def _reset_run_stats(self):
+        """Reset the per-run statistics before a new humanization run."""
+        with self._stats_lock:
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.fallbacks = []
+            self.run_metrics = self._empty_run_metrics()
+    
+    def _observe_call(self, started: float, iteration: int, result: str, completion=None):
+        """
+        Record the duration and token usage of one chunk iteration.
+        
+        Args:
+            started: time.perf_counter() when the iteration started
+            iteration: Iteration number
+            result: "cached", "coalesced" (shared another request's call), "ok" or "fallback"
+            completion: Groq completion, when the API call succeeded
+        """
+        elapsed = time.perf_counter() - started
+        HUMANIZER_CALL_SECONDS.observe(elapsed, model=self.model, iteration=iteration, result=result)
+        if result == "cached":
+            return
+        if result == "coalesced":
+            with self._stats_lock:
+                self.run_metrics["coalesced_calls"] += 1
+            return
+        usage = getattr(completion, "usage", None)
+        with self._stats_lock:
+            self.run_metrics["api_calls"] += 1
+            self.run_metrics["api_seconds"] += elapsed
+            for kind in ("prompt", "completion"):
+                tokens = getattr(usage, f"{kind}_tokens", None)
+                if isinstance(tokens, int):
+                    self.run_metrics[f"{kind}_tokens"] += tokens
+    
+    def get_run_metrics(self) -> Dict[str, float]:
+        """
+        Return timing and token metrics for the most recent humanization run.
+        
+        Returns:
+            Dictionary with stage durations, API call count and time, token
+            usage, cache hits/misses and the number of fallbacks
+        """
+        with self._stats_lock:
+            metrics = {
+                name: round(value, 4) if isinstance(value, float) else value
+                for name, value in self.run_metrics.items()
+            }
+            metrics.update(cache_hits=self.cache_hits, cache_misses=self.cache_misses, fallbacks=len(self.fallbacks))
+        return metrics
+    
+    def get_cache_stats(self) -> Dict[str, float]:
         """
-        Generate a warning about avoiding common AI phrases.
+        Return cache statistics for the most recent humanization run.
         
         Returns:
-            String with AI phrases to avoid during humanization
+            Dictionary with hits, misses and hit_rate
+        """
+        with self._stats_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": self.cache_hits / lookups if lookups else 0.0
+            }
+    
+    def _record_fallback(self, chunk_num: Optional[int], iteration: int, error: Exception):
         """
-        # Take a sample of phrases to include in the prompt (to keep prompt size manageable)
-        sample_phrases = self.common_ai_phrases_to_avoid[:15]  # All phrases
-        phrases_text = '", "'.join(sample_phrases)
+        Remember that a chunk fell back to its input text after the API failed.
         
-        return f"""
-IMPORTANT - Avoid Overused AI Phrases: Try to avoid or minimize the use of common AI-generated phrases unless absolutely necessary for the meaning. These include phrases like: "{phrases_text}", and similar corporate/AI-sounding language. Use more natural, conversational alternatives when possible."""
+        Args:
+            chunk_num: 1-based chunk number (None when unknown)
+            iteration: Iteration that failed
+            error: Final error after retries
+        """
+        HUMANIZER_FALLBACKS.inc(model=self.model, iteration=iteration)
+        with self._stats_lock:
+            self.fallbacks.append({"chunk": chunk_num, "iteration": iteration, "error": str(error)})
     
-    def _humanize_paragraph(self, paragraph: str, iteration: int = 1) -> str:
+    def get_fallbacks(self) -> List[Dict]:
+        """
+        Return the chunks that fell back to unhumanized text in the most recent run.
+        
+        Returns:
+            List of {"chunk", "iteration", "error"} records (batch runs also carry "document")
+        """
+        with self._stats_lock:
+            return sorted(self.fallbacks, key=lambda record: (str(record.get("document", "")), record["chunk"] or 0, record["iteration"]))
+    
+    def _humanize_paragraph(self, paragraph: str, iteration: int = 1, chunk_num: Optional[int] = None) -> str:
         """
         Humanize a single paragraph using Groq API.
         
         Args:
             paragraph: Paragraph text to humanize
             iteration: Current iteration number (affects the prompt strategy)
+            chunk_num: 1-based chunk number, used to report fallbacks
             
         Returns:
             Humanized paragraph text
         """
-        # Get AI phrases warning
-        ai_phrases_warning = self._get_ai_phrases_warning()
+        started = time.perf_counter()
+        cache_key, cached = self._cache_lookup(paragraph, iteration)
+        if cached is not None:
+            self._observe_call(started, iteration, "cached")
+            return cached
         
-        # Different prompts for different iterations
-        if iteration == 1:
-            system_prompt = f"""You are an expert text humanizer. Your task is to rewrite AI-generated text to make it sound more natural, conversational, and human-like.
-
-Key requirements:
-1. Make the text easily readable (aim for Flesch Reading Ease score of 80+)
-2. Use simple, clear language that flows naturally
-3. Avoid robotic or overly formal language
-4. Replace formal transitions with natural ones (swap "Furthermore" → "Plus", "Moreover" → "And", "In conclusion" → "So")
-5. Vary sentence length and structure within the same overall length
-6. Make it sound like a knowledgeable human wrote it
-7. Preserve all important information and meaning
-8. CRITICAL: Maintain the same word count (±15% tolerance). Do not add extra content, examples, or explanations - only rewrite existing content.
-{ai_phrases_warning}
-
-IMPORTANT: Only return the humanized text. Do not include any explanations, introductions, or phrases like "Here is the humanized text". Just provide the rewritten content directly.
-
-Focus on making the text accessible and engaging while keeping the same length and information density."""
-
-        elif iteration == 2:
-            system_prompt = f"""You are a skilled editor focused on making text more human and relatable. Refine the text further by:
-
-1. Injecting personality and warmth through word choice, not additional words
-2. Using more conversational connectors ("And", "But", "So", "Plus") to replace formal ones
-3. Simplifying complex sentences by breaking them down or using simpler words
-4. Converting passive voice to active voice where possible
-5. Making the tone more approachable and less academic through word substitution
-6. CRITICAL: Maintain the same word count (±15% tolerance). Focus on replacing words and restructuring sentences, not adding content.
-{ai_phrases_warning}
-
-IMPORTANT: Only return the refined text. Do not include any explanations, introductions, or phrases like "Here is the refined text". Just provide the improved content directly.
-
-Keep the core message intact while making it sound like natural human communication within the same length constraints."""
-
-        else:  # iteration 3+
-            system_prompt = f"""You are a final polish editor. Make the text sound completely natural and human by:
-
-1. Ensuring perfect flow between sentences through better transitions
-2. Using everyday language instead of formal terms (replace complex words with simpler equivalents)
-3. Making sure it sounds like spoken conversation when read aloud
-4. Removing any remaining artificial-sounding phrases
-5. Ensuring the text feels warm and engaging through word choice
-6. CRITICAL: Maintain the same word count (±15% tolerance). This is a polishing pass - refine existing content without expansion.
-{ai_phrases_warning}
-
-IMPORTANT: Only return the final polished text. Do not include any explanations, introductions, or phrases like "Here is the final version". Just provide the polished content directly.
-
-This is the final pass - make it sound like a friendly, knowledgeable person explaining something, but keep it the same length."""
-
-        original_word_count = self._count_words(paragraph)
-        user_prompt = f"Please humanize this text according to the guidelines above. Original word count: {original_word_count} words. Target word count: {original_word_count} words (±15% tolerance = {int(original_word_count * 0.85)}-{int(original_word_count * 1.15)} words).\n\n{paragraph}"
+        messages = self._build_paragraph_messages(paragraph, iteration)
+        # The rewrite is about as long as the paragraph itself
+        estimated_tokens = estimate_tokens(messages) + len(paragraph) // 4
+        
+        def call():
+            # The scheduler enforces rate limits and retries transient failures
+            completion = get_scheduler(self.model).call(
+                lambda: self.client.chat.completions.create(
+                    messages=messages,
+                    model=self.model,
+                    temperature=0.7,
+                    max_tokens=self.max_completion_tokens
+                ),
+                estimated_tokens
+            )
+            # Sanitize the result to prevent Unicode encoding errors
+            result = sanitize_unicode_text(completion.choices[0].message.content.strip())
+            # Only successful results are cached, never fallbacks
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            return result, completion
         
         try:
-            completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                model=self.model,
-                temperature=0.7,
-                max_tokens=2000
+            if self.single_flight is None:
+                (result, completion), shared = call(), False
+            else:
+                # Concurrent requests for the same chunk and iteration share one call
+                (result, completion), shared = self.single_flight.do(
+                    self._flight_key(paragraph, iteration, cache_key), call)
+            self._observe_call(started, iteration, "coalesced" if shared else "ok", completion)
+            return result
+        
+        except Exception as e:
+            # Log error and return original paragraph
+            logger.warning(
+                "API error in iteration %d, falling back to original text: %s", iteration, e,
+                extra={"model": self.model, "chunk": chunk_num, "iteration": iteration}
             )
+            self._observe_call(started, iteration, "fallback")
+            self._record_fallback(chunk_num, iteration, e)
+            # Also sanitize the fallback text
+            return sanitize_unicode_text(paragraph)
+    
+    async def _ahumanize_paragraph(self, paragraph: str, iteration: int = 1, chunk_num: Optional[int] = None) -> str:
+        """
+        Async version of _humanize_paragraph built on the AsyncGroq client.
+        
+        Args:
+            paragraph: Paragraph text to humanize
+            iteration: Current iteration number (affects the prompt strategy)
+            chunk_num: 1-based chunk number, used to report fallbacks
             
-            result = completion.choices[0].message.content.strip()
+        Returns:
+            Humanized paragraph text
+        """
+        started = time.perf_counter()
+        cache_key, cached = await self._acache_lookup(paragraph, iteration)
+        if cached is not None:
+            self._observe_call(started, iteration, "cached")
+            return cached
+        
+        messages = self._build_paragraph_messages(paragraph, iteration)
+        # The rewrite is about as long as the paragraph itself
+        estimated_tokens = estimate_tokens(messages) + len(paragraph) // 4
+        
+        async def call():
+            # The scheduler enforces rate limits and retries transient failures
+            completion = await get_scheduler(self.model).acall(
+                lambda: self.async_client.chat.completions.create(
+                    messages=messages,
+                    model=self.model,
+                    temperature=0.7,
+                    max_tokens=self.max_completion_tokens
+                ),
+                estimated_tokens
+            )
             # Sanitize the result to prevent Unicode encoding errors
-            return sanitize_unicode_text(result)
+            result = sanitize_unicode_text(completion.choices[0].message.content.strip())
+            # Only successful results are cached, never fallbacks
+            if cache_key is not None:
+                await self.cache.aset(cache_key, result)
+            return result, completion
+        
+        try:
+            if self.single_flight is None:
+                (result, completion), shared = await call(), False
+            else:
+                # Concurrent requests for the same chunk and iteration share one call
+                (result, completion), shared = await self.single_flight.ado(
+                    self._flight_key(paragraph, iteration, cache_key), call)
+            self._observe_call(started, iteration, "coalesced" if shared else "ok", completion)
+            return result
         
         except Exception as e:
             # Log error and return original paragraph
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[{timestamp}]   \u26a0\ufe0f  API Error in iteration {iteration}: {str(e)}")
-            print(f"[{timestamp}]   \ud83d\udd04 Falling back to original text for this iteration")
+            logger.warning(
+                "API error in iteration %d, falling back to original text: %s", iteration, e,
+                extra={"model": self.model, "chunk": chunk_num, "iteration": iteration}
+            )
+            self._observe_call(started, iteration, "fallback")
+            self._record_fallback(chunk_num, iteration, e)
             # Also sanitize the fallback text
             return sanitize_unicode_text(paragraph)
     
@@ -401,132 +513,297 @@ This is the final pass - make it sound like a friendly, knowledgeable person exp
         Returns:IMAGE_DATA_URL
             Final coherent and humanized text
         """
-        # Get AI phrases warning
-        ai_phrases_warning = self._get_ai_phrases_warning()
+        # Comprehensive final pass prompt (precomputed)
+        system_prompt = self._system_prompt("final_pass")
         
-        # Create comprehensive final pass prompt
-        system_prompt = f"""You are an expert text editor specializing in making AI-generated content sound completely natural and human. Your task is to perform a final coherence pass on text that has already been humanized paragraph by paragraph.
-
-CRITICAL OBJECTIVES:
-1. **Maintain ALL Content**: Preserve every piece of information, data, examples, and key points from the original text. Do not remove, summarize, or omit anything important.
-
-2. **Improve Flow & Coherence**: Ensure smooth transitions between paragraphs and ideas while maintaining the existing structure and information density.
-
-3. **Enhance Natural Language**: Make the text sound like it was written by a knowledgeable human having a natural conversation with the reader.
-
-4. **Word Count Preservation**: Maintain approximately the same word count (±10% tolerance). This is content refinement, not expansion or reduction.
-
-SPECIFIC TASKS:
-• Fix any awkward transitions between paragraphs that resulted from separate processing
-• Ensure consistent tone and voice throughout the entire piece  
-• Smooth out any repetitive phrasing that may have occurred across different sections
-• Make sure the text flows as one cohesive piece rather than separate paragraphs
-• Replace any remaining formal or robotic language with natural alternatives
-• Ensure the writing feels warm, engaging, and conversational throughout
-
-{ai_phrases_warning}
-
-FORMATTING RULES:
-• Maintain the original paragraph structure and spacing
-• Keep any existing formatting, lists, or organizational elements
-• Preserve technical terms and specific information exactly as provided
-• Only return the refined text - no explanations, introductions, or meta-commentary
-
-Remember: This is a COHERENCE and FLOW improvement pass, not a content change pass. Keep everything substantial while making it read like natural human writing."""
-
         original_word_count = self._count_words(text)
         user_prompt = f"Please perform a final coherence pass on this text to make it flow naturally as one unified piece while preserving all content and information. Original word count: {original_word_count} words. Target: maintain same length.\n\n{text}"
         
         try:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[{timestamp}] 🎯 FINAL COHERENCE PASS")
-            print(f"[{timestamp}]   📝 Processing entire text ({original_word_count} words)")
-            print(f"[{timestamp}]   🎯 Goal: Improve flow and unity while preserving content")
+            logger.info("Final coherence pass on %d words", original_word_count, extra={"model": self.model})
             
-            completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                model=self.model,
-                temperature=0.6,  # Slightly lower temperature for more consistent results
-                max_tokens=4000
-            )
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            with HUMANIZER_STAGE_SECONDS.time(model=self.model, stage="final_pass"):
+                completion = get_scheduler(self.model).call(
+                    lambda: self.client.chat.completions.create(
+                        messages=messages,
+                        model=self.model,
+                        temperature=0.6,  # Slightly lower temperature for more consistent results
+                        max_tokens=4000
+                    ),
+                    estimate_tokens(messages) + len(text) // 4
+                )
             
             result = completion.choices[0].message.content.strip()
             # Sanitize the result to prevent Unicode encoding errors
             result = sanitize_unicode_text(result)
             final_word_count = self._count_words(result)
             
-            print(f"[{timestamp}]   ✅ Final coherence pass completed")
-            print(f"[{timestamp}]   📊 Word count: {original_word_count} → {final_word_count} ({final_word_count - original_word_count:+d})")
+            logger.info(
+                "Final coherence pass completed: %d -> %d words", original_word_count, final_word_count,
+                extra={"model": self.model}
+            )
             
             return result
             
         except Exception as e:
             # Log error and return original text
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[{timestamp}]   ⚠️  API Error in final coherence pass: {str(e)}")
-            print(f"[{timestamp}]   🔄 Returning text without final pass")
+            logger.warning("API error in final coherence pass, returning text without it: %s", e,
+                           extra={"model": self.model})
             # Sanitize the fallback text as well
             return sanitize_unicode_text(text)
     
-    def humanize_text(self, text: str, n_iterations: int = 2) -> str:
+    def _passes_quality_checks(self, original: str, current: str) -> bool:
         """
-        Humanize the entire text by processing paragraphs with multiple iterations.
+        Check a rewritten chunk against the convergence criteria.
+        
+        The checks run locally and cheapest first: word-count drift, then
+        AI-phrase hits, then readability.
+        
+        Args:
+            original: Chunk text before the first iteration
+            current: Chunk text after the latest iteration
+            
+        Returns:
+            True if the chunk needs no further iterations
+        """
+        # Imported here so loading this module does not pull in numpy
+        from text_metrics import flesch_reading_ease, word_count_drift
+        
+        criteria = self.convergence_criteria
+        if word_count_drift(self._count_words(original), self._count_words(current)) > criteria.max_word_drift:
+            return False
+        if get_default_detector().score(current).total_hits > criteria.max_phrase_hits:
+            return False
+        return flesch_reading_ease(current) >= criteria.min_reading_ease
+    
+    def _should_stop(self, original: str, current: str, iteration: int, n_iterations: int,
+                     chunk_num: Optional[int]) -> bool:
+        """
+        Decide whether a chunk can skip its remaining iterations (convergence mode only).
+        
+        Args:
+            original: Chunk text before the first iteration
+            current: Chunk text after the latest iteration
+            iteration: Iteration just completed
+            n_iterations: Iterations requested
+            chunk_num: 1-based chunk number (used for logging)
+            
+        Returns:
+            True if the iteration loop should stop
+        """
+        if not self.converge or not self._passes_quality_checks(original, current):
+            return False
+        skipped = n_iterations - iteration
+        HUMANIZER_ITERATIONS_SKIPPED.inc(skipped, model=self.model)
+        with self._stats_lock:
+            self.run_metrics["iterations_skipped"] += skipped
+        logger.debug("Chunk %s converged after iteration %d, skipping %d", chunk_num, iteration, skipped,
+                     extra={"sampled": True, "model": self.model, "chunk": chunk_num, "iteration": iteration})
+        return True
+    
+    def _humanize_chunk(self, paragraph: str, chunk_num: int, total_chunks: int, n_iterations: int) -> str:
+        """
+        Run the full iteration chain for a single chunk.
+        
+        Chunks are independent of each other until they are joined, so this
+        method is safe to run for several chunks at the same time.
+        
+        Args:
+            paragraph: Chunk text to humanize
+            chunk_num: 1-based position of the chunk (used for logging)
+            total_chunks: Total number of chunks in the document
+            n_iterations: Number of humanization passes
+            
+        Returns:
+            Humanized chunk text
+        """
+        current_paragraph = paragraph
+        
+        # Apply multiple iterations of humanization
+        for iteration in range(1, n_iterations + 1):
+            current_paragraph = self._humanize_paragraph(current_paragraph, iteration, chunk_num)
+            logger.debug("Completed iteration %d/%d for chunk %d/%d", iteration, n_iterations, chunk_num, total_chunks,
+                         extra={"sampled": True, "model": self.model, "chunk": chunk_num, "iteration": iteration})
+            if iteration < n_iterations and self._should_stop(paragraph, current_paragraph, iteration, n_iterations, chunk_num):
+                break
+        
+        return current_paragraph
+    
+    async def _ahumanize_chunk(self, paragraph: str, chunk_num: int, total_chunks: int, n_iterations: int) -> str:
+        """
+        Async version of _humanize_chunk.
+        
+        Args:
+            paragraph: Chunk text to humanize
+            chunk_num: 1-based position of the chunk (used for logging)
+            total_chunks: Total number of chunks in the document
+            n_iterations: Number of humanization passes
+            
+        Returns:
+            Humanized chunk text
+        """
+        current_paragraph = paragraph
+        
+        for iteration in range(1, n_iterations + 1):
+            current_paragraph = await self._ahumanize_paragraph(current_paragraph, iteration, chunk_num)
+            logger.debug("Completed iteration %d/%d for chunk %d/%d", iteration, n_iterations, chunk_num, total_chunks,
+                         extra={"sampled": True, "model": self.model, "chunk": chunk_num, "iteration": iteration})
+            if iteration < n_iterations and self._should_stop(paragraph, current_paragraph, iteration, n_iterations, chunk_num):
+                break
+        
+        return current_paragraph
+    
+    def _start_run(self, total_chunks: int, n_iterations: int, workers: int):
+        """Log the start of a humanization run and start timing it."""
+        self._run_started = time.perf_counter()
+        logger.info(
+            "Humanization started: %d chunks x %d iterations, %d in parallel",
+            total_chunks, n_iterations, workers,
+            extra={"model": self.model, "chunks": total_chunks, "iterations": n_iterations, "workers": workers}
+        )
+    
+    def _finish_run(self, total_chunks: int, n_iterations: int):
+        """Record the duration of a humanization run and log its end."""
+        elapsed = time.perf_counter() - self._run_started
+        HUMANIZER_STAGE_SECONDS.observe(elapsed, model=self.model, stage="humanize")
+        with self._stats_lock:
+            self.run_metrics["humanize_seconds"] += elapsed
+        stats = self.get_cache_stats()
+        logger.info(
+            "Humanization completed: %d chunks x %d iterations (%d cache hits, %d fallbacks)",
+            total_chunks, n_iterations, stats["hits"], len(self.fallbacks),
+            extra={"model": self.model, "chunks": total_chunks, "iterations": n_iterations}
+        )
+    
+    def split_text(self, text: str) -> List[str]:
+        """
+        Sanitize one document, apply the optional pre-pass and split it into chunks.
+        
+        The pre-pass picks replacements at random, so splitting the same text
+        twice can give different chunks; callers that resume work must keep
+        the chunk list from the first split.
         
         Args:
             text: Input text to humanize
-            n_iterations: Number of humanization passes (1-5 recommended)
             
         Returns:
-            Fully humanized text
+            List of chunk strings (empty for blank input)
         """
         if not text.strip():
-            return text
+            return []
         
+        started = time.perf_counter()
         # Sanitize input text to prevent Unicode encoding errors
         text = sanitize_unicode_text(text)
         
+        if self.naive_prepass:
+            # Cheap local phrase replacement first, so the model has less to fix
+            text, num_replacements, _ = naive_humanize(text)
+            logger.info("Naive pre-pass replaced %d phrases", num_replacements)
+        
+        # Detect paragraphs
+        chunks = self._detect_paragraphs(text)
+        
+        elapsed = time.perf_counter() - started
+        HUMANIZER_STAGE_SECONDS.observe(elapsed, model=self.model, stage="chunking")
+        with self._stats_lock:
+            self.run_metrics["chunking_seconds"] += elapsed
+        return chunks
+    
+    def _prepare_chunks(self, text: str, n_iterations: int, max_concurrency: Optional[int],
+                        chunks: Optional[Sequence[str]] = None):
+        """
+        Sanitize and chunk the input and work out run parameters.
+        
+        Args:
+            text: Input text to humanize
+            n_iterations: Requested number of humanization passes
+            max_concurrency: Override for the instance concurrency limit
+            chunks: Chunks from an earlier split_text call; text is not split again
+            
+        Returns:
+            Tuple of (chunks, n_iterations, workers); chunks is empty when there is nothing to do
+        """
         # Validate n_iterations
         n_iterations = max(1, min(n_iterations, 5))  # Limit between 1-5
         
-        # Detect paragraphs
-        paragraphs = self._detect_paragraphs(text)
+        self._reset_run_stats()
         
-        if not paragraphs:
-            return text
+        paragraphs = list(chunks) if chunks is not None else self.split_text(text)
         
-        # Print initial status
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"\n[{timestamp}] 🚀 HUMANIZATION STARTED")
-        print(f"[{timestamp}] 📝 Processing {len(paragraphs)} chunk{'s' if len(paragraphs) != 1 else ''} with {n_iterations} iteration{'s' if n_iterations != 1 else ''}")
-        print(f"[{timestamp}] 🤖 Using model: {self.model}")
-        print(f"[{timestamp}] " + "="*50)
+        workers = max(1, min(max_concurrency or self.max_concurrency, len(paragraphs) or 1))
+        return paragraphs, n_iterations, workers
+    
+    def iter_humanize_text(self, text: str, n_iterations: int = 2,
+                           max_concurrency: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+        """
+        Humanize text and yield each chunk as soon as its last iteration completes.
         
-        # Process each paragraph through multiple iterations
-        humanized_paragraphs = []
+        Chunks are yielded in completion order, not document order, so callers
+        should place them using the returned index.
         
-        for i, paragraph in enumerate(paragraphs):
-            current_paragraph = paragraph
-            chunk_num = i + 1
-            
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] 📄 Processing chunk {chunk_num}/{len(paragraphs)} ({len(paragraph.split())} words)")
+        Args:
+            text: Input text to humanize
+            n_iterations: Number of humanization passes (1-5 recommended)
+            max_concurrency: Override for the instance concurrency limit (1 = sequential)
             
-            # Apply multiple iterations of humanization
-            for iteration in range(1, n_iterations + 1):
-                print(f"[{datetime.now().strftime('%H:%M:%S')}]   🔄 Iteration {iteration}/{n_iterations} for chunk {chunk_num}")
-                sys.stdout.flush()  # Ensure immediate output
-                
-                current_paragraph = self._humanize_paragraph(current_paragraph, iteration)
-                
-                print(f"[{datetime.now().strftime('%H:%M:%S')}]   ✅ Completed iteration {iteration}/{n_iterations} for chunk {chunk_num}")
+        Yields:
+            Tuples of (chunk index, total chunks, humanized chunk text)
+        """
+        paragraphs, n_iterations, workers = self._prepare_chunks(text, n_iterations, max_concurrency)
+        if not paragraphs:
+            return
+        
+        total_chunks = len(paragraphs)
+        self._start_run(total_chunks, n_iterations, workers)
+        
+        if workers == 1:
+            for i, paragraph in enumerate(paragraphs):
+                yield i, total_chunks, self._humanize_chunk(paragraph, i + 1, total_chunks, n_iterations)
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                futures = {
+                    executor.submit(self._humanize_chunk, paragraph, i + 1, total_chunks, n_iterations): i
+                    for i, paragraph in enumerate(paragraphs)
+                }
+                for future in as_completed(futures):
+                    yield futures[future], total_chunks, future.result()
+            finally:
+                # Drop queued chunks if the consumer stops early (e.g. client disconnect)
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        self._finish_run(total_chunks, n_iterations)
+    
+    def humanize_text(self, text: str, n_iterations: int = 2, max_concurrency: Optional[int] = None) -> str:
+        """
+        Humanize the entire text by processing paragraphs with multiple iterations.
+        
+        Each chunk's iteration chain runs independently, so up to
+        ``max_concurrency`` chunks are processed in parallel. Output order
+        always matches input order.
+        
+        Args:
+            text: Input text to humanize
+            n_iterations: Number of humanization passes (1-5 recommended)
+            max_concurrency: Override for the instance concurrency limit (1 = sequential)
             
-            humanized_paragraphs.append(current_paragraph)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✨ Finished processing chunk {chunk_num}/{len(paragraphs)}")
+        Returns:
+            Fully humanized text
+        """
+        humanized_paragraphs: Dict[int, str] = {}
+        for index, _, chunk in self.iter_humanize_text(text, n_iterations, max_concurrency):
+            humanized_paragraphs[index] = chunk
+        
+        if not humanized_paragraphs:
+            return text
         
-        # Join paragraphs back together with double newlines
-        result = '\n\n'.join(humanized_paragraphs)
+        # Join paragraphs back together with double newlines, in document order
+        result = '\n\n'.join(humanized_paragraphs[i] for i in range(len(humanized_paragraphs)))
         
         # Skip final coherence pass - preserve paragraph-wise humanization results
         # Final LLM pass removed as requested - paragraph-wise approach is final
@@ -539,19 +816,196 @@ Remember: This is a COHERENCE and FLOW improvement pass, not a content change pa
         #     
         #     print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Final coherence pass completed")
         
-        # Print completion status
-        final_timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"\n[{final_timestamp}] " + "="*50)
-        print(f"[{final_timestamp}] 🎉 HUMANIZATION COMPLETED SUCCESSFULLY")
-        print(f"[{final_timestamp}] 📊 Processed {len(paragraphs)} chunks with {n_iterations} iterations each")
+        return result
+    
+    async def aiter_humanize_text(self, text: str, n_iterations: int = 2, max_concurrency: Optional[int] = None,
+                                  skip_chunks: Optional[AbstractSet[int]] = None,
+                                  chunks: Optional[Sequence[str]] = None) -> AsyncIterator[Tuple[int, int, str]]:
+        """
+        Async version of iter_humanize_text.
+        
+        A run that was interrupted can be resumed by passing the chunks it
+        worked on (from split_text) and the indices it already finished.
         
-        # Calculate total operations (no final pass)
-        total_operations = len(paragraphs) * n_iterations
-        print(f"[{final_timestamp}] 📝 Total operations: {total_operations} API calls (paragraph-wise humanization only)")
+        Args:
+            text: Input text to humanize
+            n_iterations: Number of humanization passes (1-5 recommended)
+            max_concurrency: Override for the instance concurrency limit (1 = sequential)
+            skip_chunks: Indices of chunks finished by an earlier run; they are neither sent nor yielded
+            chunks: Chunks from an earlier split_text call, so a resumed run keeps the same boundaries
             
-        print(f"[{final_timestamp}] 💾 Output ready for delivery\n")
+        Yields:
+            Tuples of (chunk index, total chunks, humanized chunk text) in completion order
+        """
+        paragraphs, n_iterations, workers = self._prepare_chunks(text, n_iterations, max_concurrency, chunks)
+        if not paragraphs:
+            return
         
-        return result
+        total_chunks = len(paragraphs)
+        self._start_run(total_chunks, n_iterations, workers)
+        
+        semaphore = asyncio.Semaphore(workers)
+        
+        async def run_chunk(index: int, paragraph: str) -> Tuple[int, str]:
+            async with semaphore:
+                return index, await self._ahumanize_chunk(paragraph, index + 1, total_chunks, n_iterations)
+        
+        skip_chunks = skip_chunks or frozenset()
+        tasks = [asyncio.ensure_future(run_chunk(i, paragraph))
+                 for i, paragraph in enumerate(paragraphs) if i not in skip_chunks]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, chunk = await next_done
+                yield index, total_chunks, chunk
+        finally:
+            # Cancel outstanding chunks if the consumer stops early (e.g. client disconnect)
+            for task in tasks:
+                task.cancel()
+        
+        self._finish_run(total_chunks, n_iterations)
+    
+    async def ahumanize_text(self, text: str, n_iterations: int = 2, max_concurrency: Optional[int] = None) -> str:
+        """
+        Async version of humanize_text for use inside an event loop.
+        
+        Upstream calls are awaited on the AsyncGroq client, so the event loop
+        stays free to serve other requests while chunks are in flight.
+        
+        Args:
+            text: Input text to humanize
+            n_iterations: Number of humanization passes (1-5 recommended)
+            max_concurrency: Override for the instance concurrency limit (1 = sequential)
+            
+        Returns:
+            Fully humanized text
+        """
+        humanized_paragraphs: Dict[int, str] = {}
+        async for index, _, chunk in self.aiter_humanize_text(text, n_iterations, max_concurrency):
+            humanized_paragraphs[index] = chunk
+        
+        if not humanized_paragraphs:
+            return text
+        
+        return '\n\n'.join(humanized_paragraphs[i] for i in range(len(humanized_paragraphs)))
+    
+    def _prepare_batch(self, documents: Dict[str, str], n_iterations: int, max_concurrency: Optional[int]):
+        """
+        Chunk every document in a batch into one flat list of work items.
+        
+        Args:
+            documents: Mapping of document id to text
+            n_iterations: Requested number of humanization passes
+            max_concurrency: Override for the instance concurrency limit
+            
+        Returns:
+            Tuple of (work items as (doc_id, chunk_index, chunk), chunk counts per document,
+            n_iterations, workers)
+        """
+        n_iterations = max(1, min(n_iterations, 5))  # Limit between 1-5
+        self._reset_run_stats()
+        
+        work_items: List[Tuple[str, int, str]] = []
+        chunk_counts: Dict[str, int] = {}
+        for doc_id, text in documents.items():
+            paragraphs = self.split_text(text)
+            chunk_counts[doc_id] = len(paragraphs)
+            work_items.extend((doc_id, i, paragraph) for i, paragraph in enumerate(paragraphs))
+        
+        workers = max(1, min(max_concurrency or self.max_concurrency, len(work_items) or 1))
+        return work_items, chunk_counts, n_iterations, workers
+    
+    def _label_batch_fallbacks(self, work_items: List[Tuple[str, int, str]]):
+        """Rewrite batch-wide chunk numbers in fallback records as (document, chunk) pairs."""
+        with self._stats_lock:
+            for record in self.fallbacks:
+                if record["chunk"] is not None and "document" not in record:
+                    doc_id, index, _ = work_items[record["chunk"] - 1]
+                    record["document"] = doc_id
+                    record["chunk"] = index + 1
+    
+    @staticmethod
+    def _assemble_batch(documents: Dict[str, str], chunk_counts: Dict[str, int],
+                        humanized: Dict[Tuple[str, int], str]) -> Dict[str, str]:
+        """Join humanized chunks back into documents, keyed by document id."""
+        results = {}
+        for doc_id, text in documents.items():
+            count = chunk_counts.get(doc_id, 0)
+            if count == 0:
+                results[doc_id] = text
+            else:
+                results[doc_id] = '\n\n'.join(humanized[(doc_id, i)] for i in range(count))
+        return results
+    
+    def humanize_batch(self, documents: Dict[str, str], n_iterations: int = 2,
+                       max_concurrency: Optional[int] = None) -> Dict[str, str]:
+        """
+        Humanize many documents at once.
+        
+        All documents are chunked up front and every chunk is scheduled on
+        one shared worker pool, so short documents keep the pool saturated
+        instead of each paying its own per-request overhead.
+        
+        Args:
+            documents: Mapping of document id to text
+            n_iterations: Number of humanization passes (1-5 recommended)
+            max_concurrency: Override for the instance concurrency limit
+            
+        Returns:
+            Mapping of document id to humanized text
+        """
+        work_items, chunk_counts, n_iterations, workers = self._prepare_batch(documents, n_iterations, max_concurrency)
+        if not work_items:
+            return dict(documents)
+        
+        total_chunks = len(work_items)
+        self._start_run(total_chunks, n_iterations, workers)
+        
+        def run_item(numbered_item) -> str:
+            number, (_, _, paragraph) = numbered_item
+            return self._humanize_chunk(paragraph, number + 1, total_chunks, n_iterations)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(run_item, enumerate(work_items)))
+        
+        humanized = {(doc_id, index): output for (doc_id, index, _), output in zip(work_items, outputs)}
+        self._label_batch_fallbacks(work_items)
+        self._finish_run(total_chunks, n_iterations)
+        return self._assemble_batch(documents, chunk_counts, humanized)
+    
+    async def ahumanize_batch(self, documents: Dict[str, str], n_iterations: int = 2,
+                              max_concurrency: Optional[int] = None) -> Dict[str, str]:
+        """
+        Async version of humanize_batch.
+        
+        Args:
+            documents: Mapping of document id to text
+            n_iterations: Number of humanization passes (1-5 recommended)
+            max_concurrency: Override for the instance concurrency limit
+            
+        Returns:
+            Mapping of document id to humanized text
+        """
+        work_items, chunk_counts, n_iterations, workers = self._prepare_batch(documents, n_iterations, max_concurrency)
+        if not work_items:
+            return dict(documents)
+        
+        total_chunks = len(work_items)
+        self._start_run(total_chunks, n_iterations, workers)
+        
+        semaphore = asyncio.Semaphore(workers)
+        
+        async def run_item(number: int, paragraph: str) -> str:
+            async with semaphore:
+                return await self._ahumanize_chunk(paragraph, number + 1, total_chunks, n_iterations)
+        
+        outputs = await asyncio.gather(
+            *(run_item(number, paragraph) for number, (_, _, paragraph) in enumerate(work_items))
+        )
+        
+        humanized = {(doc_id, index): output for (doc_id, index, _), output in zip(work_items, outputs)}
+        self._label_batch_fallbacks(work_items)
+        self._finish_run(total_chunks, n_iterations)
+        return self._assemble_batch(documents, chunk_counts, humanized)
     
     def quick_humanize(self, text: str) -> str:
         """
@@ -567,7 +1021,9 @@ Remember: This is a COHERENCE and FLOW improvement pass, not a content change pa
 
 
 # Example usage and testing
-if __name__ == "__main__":
+def main():
+    """Humanize a sample text and report the word-count change (needs GROQ_API_KEY)."""
+    load_env()
     # Test the humanizer
     sample_text = """
     Artificial intelligence represents a transformative technological advancement that has the potential to revolutionize numerous industries. Furthermore, machine learning algorithms enable systems to learn from data and improve their performance over time. Moreover, the implementation of AI solutions can significantly enhance operational efficiency and decision-making processes.
@@ -604,4 +1060,8 @@ if __name__ == "__main__":
         
     except Exception as e:
         print(f"Error: {e}")
-        print("Make sure you have GROQ_API_KEY set in your environment variables.")
\ No newline at end of file
+        print("Make sure you have GROQ_API_KEY set in your environment variables.")
+
+
+if __name__ == "__main__":
+    main()
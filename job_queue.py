@@ -0,0 +1,466 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from humanize_using_groq import HumanizeTextWithGroq
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Job states; "running" jobs whose lease has expired are picked up again by any worker
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+_JOB_COLUMNS = ("job_id", "status", "model", "iterations", "naive_prepass", "converge", "total_chunks",
+                "completed_chunks", "result", "error", "fallback_chunks", "created_at", "updated_at")
+
+
+class JobStore:
+    """
+    Humanization jobs and their finished chunks in a SQLite file (WAL mode).
+
+    Every chunk is checkpointed as soon as its last iteration completes, so
+    an interrupted job can resume without paying for those chunks again.
+    Workers claim jobs with a renewable lease, so several processes can
+    share one file without running the same job twice.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS humanize_jobs ("
+                "  job_id TEXT PRIMARY KEY, status TEXT NOT NULL, model TEXT NOT NULL,"
+                "  iterations INTEGER NOT NULL, naive_prepass INTEGER NOT NULL, converge INTEGER NOT NULL,"
+                "  text TEXT NOT NULL, total_chunks INTEGER, completed_chunks INTEGER NOT NULL DEFAULT 0,"
+                "  result TEXT, error TEXT, fallback_chunks TEXT, lease_owner TEXT, lease_expires REAL,"
+                "  created_at REAL NOT NULL, updated_at REAL NOT NULL, chunk_plan TEXT);"
+                "CREATE INDEX IF NOT EXISTS humanize_jobs_status ON humanize_jobs (status, created_at);"
+                "CREATE TABLE IF NOT EXISTS humanize_job_chunks ("
+                "  job_id TEXT NOT NULL, chunk_index INTEGER NOT NULL, text TEXT NOT NULL,"
+                "  PRIMARY KEY (job_id, chunk_index));"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(humanize_jobs)")}
+            if "chunk_plan" not in columns:
+                # Files created before chunk plans were stored
+                self._conn.execute("ALTER TABLE humanize_jobs ADD COLUMN chunk_plan TEXT")
+            self._conn.commit()
+
+    def create(self, text: str, model: str, iterations: int, naive_prepass: bool, converge: bool) -> str:
+        """
+        Add a queued job.
+
+        Args:
+            text: Sanitized text to humanize
+            model: Groq model to use
+            iterations: Humanization passes per chunk
+            naive_prepass: Run the phrase-replace pre-pass first
+            converge: Stop iterating chunks that pass the local quality checks
+
+        Returns:
+            New job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO humanize_jobs (job_id, status, model, iterations, naive_prepass, converge, text,"
+                " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, model, iterations, int(naive_prepass), int(converge), text, now, now),
+            )
+            self._conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Return a job's status without its input text, or None if it does not exist.
+
+        Args:
+            job_id: Job identifier
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM humanize_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_JOB_COLUMNS, row))
+        job["naive_prepass"] = bool(job["naive_prepass"])
+        job["converge"] = bool(job["converge"])
+        job["fallback_chunks"] = json.loads(job["fallback_chunks"]) if job["fallback_chunks"] else []
+        return job
+
+    def get_text(self, job_id: str) -> str:
+        with self._lock:
+            return self._conn.execute("SELECT text FROM humanize_jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+    def get_chunk_plan(self, job_id: str) -> Optional[List[str]]:
+        """Return the chunks a job was split into when it first ran, or None if it has not run yet."""
+        with self._lock:
+            row = self._conn.execute("SELECT chunk_plan FROM humanize_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def save_chunk_plan(self, job_id: str, chunks: List[str]):
+        """
+        Store the chunks a job was split into, so a resumed run works on the same boundaries.
+
+        Args:
+            job_id: Job identifier
+            chunks: Chunk texts after sanitizing and the optional pre-pass
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE humanize_jobs SET chunk_plan = ?, total_chunks = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(chunks), len(chunks), time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[str]:
+        """
+        Lease the oldest queued job, or a running job whose lease has expired.
+
+        Args:
+            owner: Unique id of the claiming worker
+            lease_seconds: How long the lease lasts unless renewed
+
+        Returns:
+            Claimed job id, or None when there is no work
+        """
+        now = time.time()
+        with self._lock:
+            # A single UPDATE is atomic, so two processes can never claim the same job
+            claimed = self._conn.execute(
+                "UPDATE humanize_jobs SET status = ?, lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE job_id = (SELECT job_id FROM humanize_jobs WHERE status = ? "
+                "  OR (status = ? AND COALESCE(lease_expires, 0) < ?) ORDER BY created_at LIMIT 1)",
+                (RUNNING, owner, now + lease_seconds, now, QUEUED, RUNNING, now),
+            ).rowcount
+            self._conn.commit()
+            if not claimed:
+                return None
+            row = self._conn.execute(
+                "SELECT job_id FROM humanize_jobs WHERE status = ? AND lease_owner = ?", (RUNNING, owner)
+            ).fetchone()
+        return row[0] if row else None
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease.
+
+        Returns:
+            False if the worker no longer holds the job
+        """
+        with self._lock:
+            renewed = self._conn.execute(
+                "UPDATE humanize_jobs SET lease_expires = ? WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, owner, RUNNING),
+            ).rowcount
+            self._conn.commit()
+        return bool(renewed)
+
+    def release(self, job_id: str, owner: str):
+        """Put a running job back in the queue, so another worker resumes it right away."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE humanize_jobs SET status = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                (QUEUED, job_id, owner, RUNNING),
+            )
+            self._conn.commit()
+
+    def save_chunk(self, job_id: str, index: int, total_chunks: int, text: str):
+        """
+        Checkpoint one finished chunk.
+
+        Args:
+            job_id: Job identifier
+            index: Chunk index in the document
+            total_chunks: Number of chunks in the document
+            text: Humanized chunk text
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO humanize_job_chunks (job_id, chunk_index, text) VALUES (?, ?, ?)",
+                (job_id, index, text),
+            )
+            self._conn.execute(
+                "UPDATE humanize_jobs SET total_chunks = ?, updated_at = ?, completed_chunks = "
+                "(SELECT COUNT(*) FROM humanize_job_chunks WHERE job_id = ?) WHERE job_id = ?",
+                (total_chunks, time.time(), job_id, job_id),
+            )
+            self._conn.commit()
+
+    def completed_chunks(self, job_id: str) -> Dict[int, str]:
+        """Return the checkpointed chunks of a job by index."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_index, text FROM humanize_job_chunks WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def finish(self, job_id: str, result: str, fallback_chunks: List[Dict]):
+        """Store a job's result and drop its chunk checkpoints."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE humanize_jobs SET status = ?, result = ?, fallback_chunks = ?, updated_at = ? WHERE job_id = ?",
+                (DONE, result, json.dumps(fallback_chunks), time.time(), job_id),
+            )
+            self._conn.execute("DELETE FROM humanize_job_chunks WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def fail(self, job_id: str, error: str):
+        """Mark a job as failed; its checkpoints are kept so it can be resubmitted cheaply."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE humanize_jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                (FAILED, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def delete_finished_before(self, cutoff: float) -> int:
+        """
+        Remove finished jobs last updated before a timestamp.
+
+        Args:
+            cutoff: Unix timestamp
+
+        Returns:
+            Number of jobs removed
+        """
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT job_id FROM humanize_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, cutoff),
+            )]
+            for job_id in expired:
+                self._conn.execute("DELETE FROM humanize_job_chunks WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM humanize_jobs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+        return len(expired)
+
+
+class HumanizeJobQueue:
+    """
+    Runs humanization jobs on a pool of background workers.
+
+    Submitting returns a job id immediately. Workers claim jobs from the
+    JobStore, humanize their chunks and checkpoint each one, so clients can
+    poll progress from any process. A worker that stops or crashes loses its
+    lease, and the job resumes elsewhere from its last completed chunk.
+    """
+
+    # Run the finished-job sweep at most this often (seconds)
+    sweep_interval = 300.0
+
+    def __init__(self, store: JobStore, api_key: Optional[str] = None, workers: int = 2,
+                 job_ttl_seconds: Optional[float] = 24 * 3600, poll_interval: float = 1.0,
+                 lease_seconds: float = 60.0):
+        """
+        Args:
+            store: Where jobs and chunk checkpoints are kept
+            api_key: Groq API key passed to HumanizeTextWithGroq
+            workers: Number of jobs humanized at the same time in this process
+            job_ttl_seconds: Finished jobs are deleted this long after they end (None = never)
+            poll_interval: How often idle workers and subscribers re-read the store (seconds)
+            lease_seconds: How long a crashed worker keeps its job before another worker may take it
+        """
+        self.store = store
+        self.api_key = api_key
+        self.workers = max(1, workers)
+        self.job_ttl_seconds = job_ttl_seconds
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._work_available: Optional[asyncio.Event] = None
+        self._progress: Optional[asyncio.Condition] = None
+        self._last_sweep = 0.0
+
+    async def start(self):
+        """Start the workers; they also pick up jobs left unfinished by earlier processes."""
+        self._work_available = asyncio.Event()
+        self._progress = asyncio.Condition()
+        prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks = [asyncio.create_task(self._worker(f"{prefix}:{i}")) for i in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers and hand their jobs back to the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, text: str, model: str, iterations: int, naive_prepass: bool = False,
+                     converge: bool = False) -> Dict:
+        """
+        Queue a humanization job.
+
+        Args:
+            text: Sanitized text to humanize
+            model: Groq model to use
+            iterations: Humanization passes per chunk (clamped to 1-5)
+            naive_prepass: Run the phrase-replace pre-pass first
+            converge: Stop iterating chunks that pass the local quality checks
+
+        Returns:
+            The queued job's status
+        """
+        await self._sweep()
+        job_id = await asyncio.to_thread(self.store.create, text, model, max(1, min(iterations, 5)),
+                                         naive_prepass, converge)
+        self._work_available.set()
+        logger.info("Humanization job queued", extra={"job_id": job_id, "model": model, "input_chars": len(text)})
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job's status, or None if it does not exist."""
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict]:
+        """
+        Yield a job's status every time it changes, ending once the job finishes.
+
+        Args:
+            job_id: Job identifier
+
+        Yields:
+            Job status dicts (nothing if the job does not exist)
+        """
+        last_update = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                yield job
+            if job["status"] in FINISHED_STATES:
+                return
+            # Woken by this process's workers; the timeout also picks up changes made elsewhere
+            async with self._progress:
+                try:
+                    await asyncio.wait_for(self._progress.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _notify(self):
+        async with self._progress:
+            self._progress.notify_all()
+
+    async def _sweep(self):
+        now = time.time()
+        if self.job_ttl_seconds is None or now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        removed = await asyncio.to_thread(self.store.delete_finished_before, now - self.job_ttl_seconds)
+        if removed:
+            logger.info("Removed %d expired humanization jobs", removed)
+
+    async def _wait_for_work(self):
+        # Woken by submit() in this process; the timeout also finds jobs queued by other processes
+        try:
+            await asyncio.wait_for(self._work_available.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._work_available.clear()
+
+    async def _keep_lease(self, job_id: str, owner: str, run: asyncio.Task, lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.store.renew, job_id, owner, self.lease_seconds):
+                logger.warning("Lost the lease on a humanization job", extra={"job_id": job_id})
+                lost.set()
+                run.cancel()
+                return
+
+    async def _worker(self, owner: str):
+        while True:
+            job_id = await asyncio.to_thread(self.store.claim, owner, self.lease_seconds)
+            if job_id is None:
+                await self._wait_for_work()
+                continue
+
+            run = asyncio.create_task(self._run(job_id))
+            lost = asyncio.Event()
+            keeper = asyncio.create_task(self._keep_lease(job_id, owner, run, lost))
+            try:
+                await run
+            except asyncio.CancelledError:
+                if not lost.is_set():
+                    # Shutting down: let the next worker resume from the checkpoints
+                    await asyncio.to_thread(self.store.release, job_id, owner)
+                    raise
+            except Exception as e:
+                logger.warning("Humanization job failed: %s", e, extra={"job_id": job_id})
+                await asyncio.to_thread(self.store.fail, job_id, str(e))
+            finally:
+                keeper.cancel()
+            await self._notify()
+
+    async def _run(self, job_id: str):
+        job = await self.get(job_id)
+        text = await asyncio.to_thread(self.store.get_text, job_id)
+        humanizer = HumanizeTextWithGroq(api_key=self.api_key, model=job["model"],
+                                         naive_prepass=job["naive_prepass"], converge=job["converge"])
+
+        # The pre-pass is random, so the chunks are fixed on the first run and reused when resuming;
+        # checkpoints from one split never get joined with chunks cut at other boundaries
+        plan = await asyncio.to_thread(self.store.get_chunk_plan, job_id)
+        if plan is None:
+            plan = humanizer.split_text(text)
+            await asyncio.to_thread(self.store.save_chunk_plan, job_id, plan)
+        chunks = await asyncio.to_thread(self.store.completed_chunks, job_id)
+        if chunks:
+            logger.info("Resuming humanization job from %d finished chunks", len(chunks), extra={"job_id": job_id})
+        await self._notify()
+
+        async for index, total, chunk in humanizer.aiter_humanize_text(text, job["iterations"],
+                                                                       skip_chunks=set(chunks), chunks=plan):
+            chunks[index] = chunk
+            await asyncio.to_thread(self.store.save_chunk, job_id, index, total, chunk)
+            await self._notify()
+
+        result = '\n\n'.join(chunks[i] for i in sorted(chunks)) if chunks else text
+        await asyncio.to_thread(self.store.finish, job_id, result, humanizer.get_fallbacks())
+        logger.info("Humanization job completed", extra={"job_id": job_id, "chunks": len(chunks)})
+
+
+def create_job_queue(api_key: Optional[str] = None) -> HumanizeJobQueue:
+    """
+    Build the job queue configured by environment variables.
+
+    HUMANIZER_JOB_DB sets the SQLite file, HUMANIZER_JOB_WORKERS the number
+    of jobs each process runs at once, HUMANIZER_JOB_TTL how long finished
+    jobs are kept (seconds, 0 = forever) and HUMANIZER_JOB_LEASE how long a
+    crashed process holds on to its jobs (seconds).
+
+    Args:
+        api_key: Groq API key passed to HumanizeTextWithGroq
+
+    Returns:
+        Configured HumanizeJobQueue (call start() from the event loop)
+    """
+    ttl = float(os.getenv("HUMANIZER_JOB_TTL", str(24 * 3600)))
+    store = JobStore(os.getenv("HUMANIZER_JOB_DB", ".cache/humanize_jobs.db"))
+    return HumanizeJobQueue(
+        store,
+        api_key=api_key,
+        workers=int(os.getenv("HUMANIZER_JOB_WORKERS", "2")),
+        job_ttl_seconds=ttl if ttl > 0 else None,
+        lease_seconds=float(os.getenv("HUMANIZER_JOB_LEASE", "60")),
+    )
@@ -0,0 +1,151 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+LOGGER_NAME = "humanizer"
+
+# Attributes every LogRecord has; anything else was passed through extra= and is a structured field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sampled"}
+
+_configure_lock = threading.Lock()
+_handler = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of high-volume records.
+
+    Records logged with extra={"sampled": True} (per-chunk and per-iteration
+    events) pass with probability `rate`; all other records always pass.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        """
+        Args:
+            rate: Fraction of sampled records to keep (1.0 keeps all)
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or not getattr(record, "sampled", False):
+            return True
+        return random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as text with key=value fields, or as one JSON object per line.
+    """
+
+    def __init__(self, json_output: bool = False):
+        """
+        Args:
+            json_output: Emit JSON lines instead of text
+        """
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s", datefmt="%H:%M:%S")
+        self.json_output = json_output
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES}
+        if not self.json_output:
+            line = super().format(record)
+            if fields:
+                line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+            return line
+
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **fields,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Hands records to the listener thread without formatting them on the caller's thread,
+    # and drops them instead of blocking when the queue is full. The listener thread is
+    # started by the first record, so importing modules that create loggers starts no threads.
+
+    def __init__(self, log_queue: queue.Queue, output: logging.Handler):
+        super().__init__(log_queue)
+        self.output = output
+        self.dropped = 0
+        self._listener = None
+        self._start_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def _start_listener(self):
+        with self._start_lock:
+            if self._listener is None:
+                listener = logging.handlers.QueueListener(self.queue, self.output)
+                listener.start()
+                # Flush whatever is still queued when the process exits
+                atexit.register(listener.stop)
+                self._listener = listener
+
+    def enqueue(self, record: logging.LogRecord):
+        if self._listener is None:
+            self._start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging():
+    """
+    Set up the application logger once per process.
+
+    Records are put on a bounded in-memory queue and written to stdout by a
+    background QueueListener (started with the first record), so logging
+    never does I/O on the request path. HUMANIZER_LOG_LEVEL sets the level
+    (default INFO), HUMANIZER_LOG_FORMAT selects "text" (default) or
+    "json", and HUMANIZER_LOG_SAMPLE_RATE sets the fraction of per-chunk
+    events kept. Calling it again re-reads these settings, e.g. after a
+    .env file has been loaded.
+    """
+    global _handler
+    with _configure_lock:
+        if _handler is None:
+            _handler = _DeferredQueueHandler(queue.Queue(maxsize=10000), logging.StreamHandler(sys.stdout))
+            _handler.addFilter(SamplingFilter())
+            logger = logging.getLogger(LOGGER_NAME)
+            logger.addHandler(_handler)
+            logger.propagate = False
+
+        _handler.output.setFormatter(
+            StructuredFormatter(json_output=os.getenv("HUMANIZER_LOG_FORMAT", "text").lower() == "json"))
+        for log_filter in _handler.filters:
+            if isinstance(log_filter, SamplingFilter):
+                log_filter.rate = float(os.getenv("HUMANIZER_LOG_SAMPLE_RATE", "1.0"))
+        logging.getLogger(LOGGER_NAME).setLevel(os.getenv("HUMANIZER_LOG_LEVEL", "INFO").upper())
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger under the application logger, configuring logging on first use.
+
+    No thread is started until a record is actually emitted.
+
+    Args:
+        name: Component name (usually the module's __name__)
+
+    Returns:
+        Logger named "humanizer.<name>"
+    """
+    if _handler is None:
+        configure_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
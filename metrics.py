@@ -0,0 +1,268 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow multi-retry Groq calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """
+    A monotonically increasing value per label combination.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Args:
+            name: Metric name
+            documentation: Help text shown on /metrics
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels):
+        """
+        Increase the counter.
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values (missing labels are empty)
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> list:
+        """Return the current values in a JSON-serializable form (see merge)."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, snapshots: Sequence[list]) -> Dict[Tuple[str, ...], float]:
+        """Add other processes' snapshots to this process's values (used when rendering)."""
+        with self._lock:
+            values = dict(self._values)
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                key = tuple(key)
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+    def render(self, snapshots: Sequence[list] = ()) -> List[str]:
+        values = sorted(self.merge(snapshots).items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram:
+    """
+    Counts observations into cumulative buckets per label combination.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Args:
+            name: Metric name
+            documentation: Help text shown on /metrics
+            labelnames: Names of the labels every sample carries
+            buckets: Upper bounds of the buckets (+Inf is added)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts, sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value (seconds for latencies)
+            **labels: Label values (missing labels are empty)
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall-clock duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> list:
+        """Return the current series in a JSON-serializable form (see merge)."""
+        with self._lock:
+            return [[list(key), list(counts), total, count] for key, (counts, total, count) in self._series.items()]
+
+    def merge(self, snapshots: Sequence[list]) -> Dict[Tuple[str, ...], list]:
+        """Add other processes' snapshots to this process's series (used when rendering)."""
+        with self._lock:
+            merged = {key: [list(counts), total, count] for key, (counts, total, count) in self._series.items()}
+        for snapshot in snapshots:
+            for key, counts, total, count in snapshot:
+                series = merged.setdefault(tuple(key), [[0] * len(self.buckets), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+        return merged
+
+    def render(self, snapshots: Sequence[list] = ()) -> List[str]:
+        series = sorted(self.merge(snapshots).items())
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and renders them in the Prometheus text format.
+
+    With several worker processes behind one port, a scrape only reaches one
+    of them. Each worker can therefore write its values to a shared directory
+    (write_snapshot), and render() then adds up every worker's values.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def write_snapshot(self, directory: str):
+        """
+        Write this process's values to <directory>/<pid>.json for the other workers to merge.
+
+        Args:
+            directory: Directory shared by every worker process
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        snapshot = {metric.name: metric.snapshot() for metric in self._metrics}
+        # Write then rename, so readers never see a half-written file
+        with open(path + ".tmp", "w") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+
+    def _read_snapshots(self, directory: str) -> List[Dict[str, list]]:
+        own = os.path.join(directory, f"{os.getpid()}.json")
+        snapshots = []
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            # This process's live values are newer than its snapshot
+            if os.path.abspath(path) == os.path.abspath(own):
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self, directory: Optional[str] = None) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (version 0.0.4).
+
+        Args:
+            directory: Snapshot directory of the other worker processes to add in (None = this process only)
+
+        Returns:
+            Exposition text
+        """
+        snapshots = self._read_snapshots(directory) if directory else []
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render([snapshot.get(metric.name, []) for snapshot in snapshots]))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Groq API calls (recorded by the scheduler, one observation per attempt)
+GROQ_REQUEST_SECONDS = REGISTRY.histogram(
+    "groq_request_duration_seconds", "Duration of individual Groq API attempts.", ["model", "status"])
+GROQ_QUEUE_SECONDS = REGISTRY.histogram(
+    "groq_rate_limit_wait_seconds", "Time calls waited for rate-limit budget before being sent.", ["model"])
+GROQ_RETRIES = REGISTRY.counter(
+    "groq_retries_total", "Groq calls retried after a transient failure.", ["model", "error"])
+GROQ_TOKENS = REGISTRY.counter(
+    "groq_tokens_total", "Tokens reported in Groq completion usage.", ["model", "type"])
+
+# Humanization pipeline
+HUMANIZER_STAGE_SECONDS = REGISTRY.histogram(
+    "humanizer_stage_duration_seconds", "Duration of humanization pipeline stages.", ["model", "stage"])
+HUMANIZER_CALL_SECONDS = REGISTRY.histogram(
+    "humanizer_chunk_iteration_duration_seconds",
+    "Duration of one chunk iteration including queueing and retries.", ["model", "iteration", "result"])
+HUMANIZER_CACHE_LOOKUPS = REGISTRY.counter(
+    "humanizer_cache_lookups_total", "Chunk cache lookups.", ["model", "iteration", "result"])
+HUMANIZER_FALLBACKS = REGISTRY.counter(
+    "humanizer_fallbacks_total", "Chunk iterations that fell back to their input text.", ["model", "iteration"])
+HUMANIZER_ITERATIONS_SKIPPED = REGISTRY.counter(
+    "humanizer_iterations_skipped_total", "Chunk iterations skipped because the chunk already passed the quality checks.",
+    ["model"])
+
+# HTTP endpoints
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to produce the response headers per endpoint.", ["method", "path", "status"])
@@ -0,0 +1,48 @@
+from typing import NamedTuple
+
+
+class ModelLimits(NamedTuple):
+    context_window: int
+    max_output_tokens: int
+
+
+# Context window and maximum completion tokens for the models offered in the UI
+MODEL_LIMITS = {
+    "llama-3.3-70b-versatile": ModelLimits(context_window=131072, max_output_tokens=32768),
+    "llama-3.1-8b-instant": ModelLimits(context_window=131072, max_output_tokens=131072),
+    "gemma2-9b-it": ModelLimits(context_window=8192, max_output_tokens=8192),
+    "meta-llama/llama-4-maverick-17b-128e-instruct": ModelLimits(context_window=131072, max_output_tokens=8192),
+    "meta-llama/llama-4-scout-17b-16e-instruct": ModelLimits(context_window=131072, max_output_tokens=8192),
+}
+
+# Conservative limits for models not listed above
+DEFAULT_MODEL_LIMITS = ModelLimits(context_window=8192, max_output_tokens=4096)
+
+
+def get_model_limits(model: str) -> ModelLimits:
+    """
+    Look up the token limits of a model.
+
+    Args:
+        model: Groq model name
+
+    Returns:
+        ModelLimits for the model (conservative defaults when unknown)
+    """
+    return MODEL_LIMITS.get(model, DEFAULT_MODEL_LIMITS)
+
+
+def is_supported_model(model: str) -> bool:
+    """
+    Check whether a model is one the app serves.
+
+    Clients, schedulers and metric series are created per model, so
+    endpoints reject other names before building anything.
+
+    Args:
+        model: Groq model name
+
+    Returns:
+        True if the model is listed in MODEL_LIMITS
+    """
+    return model in MODEL_LIMITS
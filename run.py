@@ -1,9 +1,55 @@
+import argparse
+import glob
+import os
+
 import uvicorn
 
-if __name__ == "__main__":
+from groq_clients import load_env
+
+# State every worker process must see, kept in SQLite (WAL) files under .cache/
+SHARED_STATE_DEFAULTS = {
+    "CHAT_STORE_BACKEND": "sqlite",
+    "CHAT_STORE_PATH": ".cache/chat_sessions.db",
+    "HUMANIZER_CACHE_PATH": ".cache/humanizer_cache.db",
+    "GROQ_RATE_LIMIT_PATH": ".cache/rate_limits.db",
+    "HUMANIZER_JOB_DB": ".cache/humanize_jobs.db",
+    # Per-worker metric snapshots, summed by whichever worker answers /metrics
+    "HUMANIZER_METRICS_DIR": ".cache/metrics",
+}
+
+
+def main():
+    # Load .env before reading settings; worker processes inherit the environment
+    load_env()
+    parser = argparse.ArgumentParser(description="Start the Humanizer application.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--production", action="store_true",
+                        help="Run several worker processes without auto-reload, sharing state through SQLite")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("HUMANIZER_WORKERS", "0")),
+                        help="Worker processes in production mode (default: one per CPU core)")
+    args = parser.parse_args()
+
     print("🚀 Starting Humanizer application...")
     print("📝 Make sure to set your GROQ_API_KEY in a .env file")
-    print("🌐 Application will be available at: http://localhost:8000")
+    print(f"🌐 Application will be available at: http://localhost:{args.port}")
+
+    if not args.production:
+        print("=" * 50)
+        uvicorn.run("backend.main:app", host=args.host, port=args.port, reload=True)
+        return
+
+    workers = args.workers or os.cpu_count() or 1
+    # Worker processes inherit the environment, so explicit settings still win
+    for name, value in SHARED_STATE_DEFAULTS.items():
+        os.environ.setdefault(name, value)
+    # Snapshots from a previous run would be added to this run's counts
+    for path in glob.glob(os.path.join(os.environ["HUMANIZER_METRICS_DIR"], "*.json")):
+        os.remove(path)
+    print(f"⚙️  Production mode: {workers} workers sharing sessions, cache, rate limits and jobs through SQLite")
     print("=" * 50)
-    
-    uvicorn.run("backend.main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("backend.main:app", host=args.host, port=args.port, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
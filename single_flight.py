@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class _LeaderCancelled(Exception):
+    """Raised to waiting callers when the call they joined was cancelled."""
+
+
+class SingleFlight:
+    """
+    Shares one execution of identical in-flight work between concurrent callers.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    with the same key while it is in flight wait for the leader's result or
+    exception instead of repeating it. Once the work finishes the key is
+    released, so later callers go through the cache or run it again.
+    Threads and coroutines are tracked separately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._async_calls: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent threads.
+
+        Args:
+            key: Identifies the work (e.g. a chunk cache key)
+            fn: Zero-argument callable doing the work
+
+        Returns:
+            Tuple of (result, shared); shared is True if another caller did the work
+
+        Raises:
+            Whatever fn raised, in the leader and in every waiting caller
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Async version of do: run fn once per key among concurrent coroutines of one event loop.
+
+        If the leader is cancelled (e.g. its client disconnected), one of the
+        waiting callers takes over the work instead of failing.
+
+        Args:
+            key: Identifies the work (e.g. a chunk cache key)
+            fn: Zero-argument callable returning the coroutine doing the work
+
+        Returns:
+            Tuple of (result, shared); shared is True if another caller did the work
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        while True:
+            future = self._async_calls.get(flight_key)
+            if future is None:
+                break
+            try:
+                # Shielded, so a waiting caller being cancelled does not cancel the shared call
+                return await asyncio.shield(future), True
+            except _LeaderCancelled:
+                continue
+
+        future = self._async_calls[flight_key] = loop.create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._async_calls[flight_key]
+            if future.done() and not future.cancelled():
+                # Mark the outcome as retrieved so an exception nobody waited for is not logged
+                future.exception()
+
+
+_default_single_flight = SingleFlight()
+
+
+def get_default_single_flight() -> Optional[SingleFlight]:
+    """
+    Return the process-wide SingleFlight used to coalesce identical chunk calls.
+
+    Set HUMANIZER_COALESCE=0 to disable coalescing.
+
+    Returns:
+        Shared SingleFlight, or None when coalescing is disabled
+    """
+    if os.getenv("HUMANIZER_COALESCE", "1") == "0":
+        return None
+    return _default_single_flight
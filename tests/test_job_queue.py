@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from humanize_using_groq import HumanizeTextWithGroq
+from job_queue import DONE, HumanizeJobQueue, JobStore
+
+# Every sentence starts with a phrase the naive pre-pass replaces at random
+_SENTENCES = [
+    "Moreover, the committee reviewed the budget for the coming year in detail.",
+    "However, several members raised concerns about the rising cost of maintenance.",
+    "Furthermore, the report found that staffing levels had not kept pace with demand.",
+    "In addition, the survey showed that residents wanted longer library hours.",
+    "Therefore, the board agreed to revisit the proposal at its next meeting.",
+]
+_DOCUMENT = "\n\n".join(" ".join(_SENTENCES[(p + i) % 5] for i in range(20)) for p in range(20))
+
+
+@pytest.fixture
+def echo_humanizer(monkeypatch):
+    """Replace the Groq call with an echo whose latency grows with the chunk number."""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+
+    async def echo(self, paragraph, iteration=1, chunk_num=None):
+        await asyncio.sleep(0.05 * (chunk_num or 1))
+        return paragraph
+
+    monkeypatch.setattr(HumanizeTextWithGroq, "_ahumanize_paragraph", echo)
+
+
+class InterruptingStore(JobStore):
+    """JobStore that reports when the first chunk checkpoint has been written."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.first_checkpoint = asyncio.Event()
+
+    def save_chunk(self, job_id, index, total_chunks, text):
+        super().save_chunk(job_id, index, total_chunks, text)
+        self.first_checkpoint.set()
+
+
+async def _wait_until_finished(queue, job_id, timeout=10.0):
+    async def finished():
+        async for job in queue.subscribe(job_id):
+            if job["status"] == DONE:
+                return job
+    return await asyncio.wait_for(finished(), timeout)
+
+
+def test_interrupted_job_resumes_on_the_original_chunks(tmp_path, echo_humanizer):
+    async def scenario():
+        store = InterruptingStore(str(tmp_path / "jobs.db"))
+        first = HumanizeJobQueue(store, workers=1, poll_interval=0.05)
+        await first.start()
+        job_id = (await first.submit(_DOCUMENT, "llama-3.3-70b-versatile", iterations=1, naive_prepass=True))["job_id"]
+
+        # Stop the process after the first chunk is checkpointed, before the rest finish
+        await asyncio.wait_for(store.first_checkpoint.wait(), 10.0)
+        await first.stop()
+        plan = store.get_chunk_plan(job_id)
+        done_before = store.completed_chunks(job_id)
+        assert plan is not None and 0 < len(done_before) < len(plan)
+
+        second = HumanizeJobQueue(JobStore(store.path), workers=1, poll_interval=0.05)
+        await second.start()
+        try:
+            job = await _wait_until_finished(second, job_id)
+        finally:
+            await second.stop()
+        return plan, done_before, job
+
+    plan, done_before, job = asyncio.run(scenario())
+
+    # The resumed run reused the stored chunks, so the echo gives back exactly the planned text
+    assert job["total_chunks"] == len(plan)
+    assert job["result"] == "\n\n".join(plan)
+    for index, text in done_before.items():
+        assert plan[index] == text
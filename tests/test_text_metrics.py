@@ -0,0 +1,22 @@
+import pytest
+
+from text_metrics import compute_style_metrics, flesch_reading_ease, quality_reports
+
+# Shorter than the three-byte look-ahead used for curly apostrophes
+_SHORT_TEXTS = ["", "a", "ab"]
+
+
+@pytest.mark.parametrize("text", _SHORT_TEXTS)
+def test_short_text_alone(text):
+    metrics = compute_style_metrics([text])
+    assert metrics.words.tolist() == [len(text.split())]
+    assert flesch_reading_ease(text) == (100.0 if not text else pytest.approx(121.22))
+
+
+def test_short_texts_in_a_batch():
+    metrics = compute_style_metrics(_SHORT_TEXTS)
+    assert metrics.words.tolist() == [0, 1, 1]
+    assert metrics.reading_ease.tolist() == pytest.approx([100.0, 121.22, 121.22])
+
+    reports = quality_reports(_SHORT_TEXTS, list(reversed(_SHORT_TEXTS)))
+    assert [report["reading_ease"] for report in reports] == pytest.approx([121.2, 121.2, 100.0])
@@ -0,0 +1,230 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from humanize_algorithm.phrase_detector import AIPhraseDetector, get_default_detector
+
+# Texts are joined with NUL bytes and scanned as one UTF-8 uint8 array, so a
+# whole batch is measured with a handful of array operations instead of a
+# Python loop per text, word or character. Words are runs of letters (an
+# apostrophe between letters keeps the word together). Every non-ASCII byte
+# counts as part of a letter, so "déjà" and "naïve" stay one word, except for
+# no-break spaces and the General Punctuation block (dashes, curly quotes,
+# ellipses, special spaces), which separate words like their ASCII forms.
+_SEPARATOR = "\x00"
+
+
+def _byte_table(characters: str) -> np.ndarray:
+    table = np.zeros(256, dtype=bool)
+    table[list(characters.encode("ascii"))] = True
+    return table
+
+
+_LETTER = _byte_table("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+# UTF-8 lead and continuation bytes
+_LETTER[0x80:] = True
+_VOWEL = _byte_table("AEIOUYaeiouy")
+_SENTENCE_END = _byte_table(".!?")
+# Whitespace and the separator both end a sentence after terminal punctuation
+_BREAK = _byte_table(" \t\n\r\f\v" + _SEPARATOR)
+# Letters before a final "e" that keep it voiced ("table", "free", "dye")
+_VOICED_E_BEFORE = _byte_table("LEYley")
+
+
+class StyleMetrics(NamedTuple):
+    """Per-text metrics for a batch; every field is an array with one entry per text."""
+    words: np.ndarray
+    sentences: np.ndarray
+    syllables: np.ndarray
+    # Flesch Reading Ease (higher is easier; 60-70 is plain English, 80+ is easy to read)
+    reading_ease: np.ndarray
+    # Population variance of words per sentence (low values read as monotonous)
+    sentence_length_variance: np.ndarray
+    ai_phrase_hits: np.ndarray
+    # AI-phrase hits per 1000 words
+    ai_phrase_density: np.ndarray
+
+
+def _shift_right(mask: np.ndarray) -> np.ndarray:
+    # Value of the previous position (False before the first)
+    return np.concatenate((np.zeros(min(1, len(mask)), mask.dtype), mask[:-1]))
+
+
+def _shift_left(mask: np.ndarray, steps: int = 1) -> np.ndarray:
+    # Value `steps` positions ahead (False/0 past the end); always the same length as mask
+    return np.concatenate((mask[steps:], np.zeros(min(steps, len(mask)), mask.dtype)))
+
+
+def compute_style_metrics(texts: Sequence[str], detector: Optional[AIPhraseDetector] = None,
+                          count_phrases: bool = True) -> StyleMetrics:
+    """
+    Measure readability, sentence-length variance and AI-phrase density for many texts at once.
+
+    Args:
+        texts: Texts to measure
+        detector: AI phrase detector (defaults to the bundled phrase list)
+        count_phrases: Scan for AI phrases (False leaves the phrase fields at zero)
+
+    Returns:
+        StyleMetrics with one entry per text, in order
+    """
+    n = len(texts)
+    if n == 0:
+        empty = np.zeros(0)
+        return StyleMetrics(*([empty] * 7))
+
+    joined = _SEPARATOR.join(texts)
+    if joined.count(_SEPARATOR) != n - 1:
+        # A NUL inside a text would be read as a separator; blank it out (offsets stay the same)
+        joined = _SEPARATOR.join(text.replace(_SEPARATOR, " ") for text in texts)
+    data = np.frombuffer(joined.encode("utf-8", "replace"), dtype=np.uint8)
+    separators = np.flatnonzero(data == 0)
+
+    next_byte = _shift_left(data)
+    after_next = _shift_left(data, 2)
+    # U+2000-U+206F (E2 80 xx / E2 81 xx) and U+00A0 (C2 A0) are punctuation and spaces, not letters
+    punctuation = (data == 0xE2) & ((next_byte == 0x80) | (next_byte == 0x81))
+    # U+2019 (E2 80 99), the typographic apostrophe in "don’t"
+    curly_apostrophe = punctuation & (next_byte == 0x80) & (after_next == 0x99)
+    no_break_space = (data == 0xC2) & (next_byte == 0xA0)
+    punctuation = punctuation | _shift_right(punctuation) | _shift_right(_shift_right(punctuation))
+    punctuation |= no_break_space | _shift_right(no_break_space)
+    letter = np.take(_LETTER, data) & ~punctuation
+
+    apostrophe = (data == ord("'")) & _shift_right(letter) & _shift_left(letter)
+    # A curly apostrophe is three bytes; it joins the letters around it the same way
+    curly = curly_apostrophe & _shift_right(letter) & _shift_left(letter, 3)
+    apostrophe |= curly | _shift_right(curly) | _shift_right(_shift_right(curly))
+    word_char = letter | apostrophe
+    word_start = word_char & ~_shift_right(word_char)
+    word_end = word_char & ~_shift_left(word_char)
+
+    start_positions = np.flatnonzero(word_start)
+    end_positions = np.flatnonzero(word_end)
+    # Text index of each word: the number of separators before it
+    word_doc = np.searchsorted(separators, start_positions)
+    n_words = len(start_positions)
+    words = np.bincount(word_doc, minlength=n)
+
+    # Syllables: vowel groups per word, minus a silent final "e" ("make" but not "table").
+    # Latin-1 letters (lead byte C3: à-ÿ) are nearly all vowels, so they count as one, with their continuation byte
+    latin1 = (data == 0xC3) & letter
+    vowel = (np.take(_VOWEL, data) & letter) | latin1 | _shift_right(latin1)
+    group_start = np.flatnonzero(vowel & ~_shift_right(vowel))
+    group_word = np.searchsorted(start_positions, group_start, side="right") - 1
+    syllables_per_word = np.bincount(group_word, minlength=n_words)
+    last = data[end_positions] | 0x20
+    before_last = data[np.maximum(end_positions - 1, 0)]
+    silent_e = (last == ord("e")) & ~np.take(_VOICED_E_BEFORE, before_last) & (syllables_per_word > 1)
+    syllables_per_word = np.maximum(syllables_per_word - silent_e, 1)
+    syllables = np.bincount(word_doc, weights=syllables_per_word, minlength=n)
+
+    # Sentence boundaries: the last of a run of .!? followed by whitespace or the end of the text
+    end_mark = np.take(_SENTENCE_END, data)
+    boundaries = np.flatnonzero(end_mark & ~np.take(_SENTENCE_END, next_byte) & np.take(_BREAK, next_byte))
+    sentences = np.maximum(np.bincount(np.searchsorted(separators, boundaries), minlength=n), 1)
+
+    # Words per sentence; the key counts the boundaries and separators before a word, so it is unique per sentence
+    sentence_key = np.searchsorted(np.union1d(boundaries, separators), start_positions)
+    if n_words:
+        first_of_sentence = np.concatenate(([True], sentence_key[1:] != sentence_key[:-1]))
+        first_indices = np.flatnonzero(first_of_sentence)
+        lengths = np.diff(np.append(first_indices, n_words)).astype(float)
+        sentence_doc = word_doc[first_indices]
+    else:
+        lengths = np.zeros(0)
+        sentence_doc = np.zeros(0, dtype=np.int64)
+    counted = np.bincount(sentence_doc, minlength=n)
+    total = np.bincount(sentence_doc, weights=lengths, minlength=n)
+    total_squares = np.bincount(sentence_doc, weights=lengths * lengths, minlength=n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_length = np.where(counted > 0, total / counted, 0.0)
+        variance = np.where(counted > 0, total_squares / counted - mean_length ** 2, 0.0)
+        reading_ease = np.where(
+            words > 0,
+            206.835 - 1.015 * (words / sentences) - 84.6 * (syllables / np.maximum(words, 1)),
+            100.0,
+        )
+
+    hits = np.zeros(n, dtype=np.int64)
+    if count_phrases:
+        detector = detector or get_default_detector()
+        if detector.pattern is not None:
+            # One regex scan over the joined batch; match offsets are mapped back to their text
+            starts = np.fromiter((match.start() for match in detector.pattern.finditer(joined)), dtype=np.int64)
+            text_ends = np.cumsum([len(text) + 1 for text in texts])
+            hits = np.bincount(np.searchsorted(text_ends, starts, side="right"), minlength=n)
+    density = np.where(words > 0, hits * 1000.0 / np.maximum(words, 1), 0.0)
+
+    return StyleMetrics(words, sentences, syllables, reading_ease, np.maximum(variance, 0.0), hits, density)
+
+
+def flesch_reading_ease(text: str) -> float:
+    """
+    Compute the Flesch Reading Ease score of a text.
+
+    Higher is easier: 60-70 is plain English, 80+ is easy to read.
+
+    Args:
+        text: Text to score
+
+    Returns:
+        Reading ease score (100.0 for text without words)
+    """
+    return float(compute_style_metrics([text], count_phrases=False).reading_ease[0])
+
+
+def word_count_drift(original_words, new_words):
+    """
+    Relative change in word count between inputs and their rewrites.
+
+    Args:
+        original_words: Word count of the input (int or array)
+        new_words: Word count of the rewrite (int or array)
+
+    Returns:
+        Absolute relative drift (0.15 = 15%); a float for scalar input, otherwise an array
+    """
+    original = np.asarray(original_words, dtype=float)
+    new = np.asarray(new_words, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drift = np.where(original > 0, np.abs(new - original) / np.maximum(original, 1), np.where(new > 0, 1.0, 0.0))
+    return float(drift) if drift.ndim == 0 else drift
+
+
+def quality_reports(originals: Sequence[str], rewrites: Sequence[str]) -> List[Dict[str, float]]:
+    """
+    Compare rewrites with their inputs, measuring every text in one batch.
+
+    Args:
+        originals: Input texts
+        rewrites: Humanized texts, in the same order
+
+    Returns:
+        One report per pair: reading ease before and after, sentence-length
+        variance, word-count drift and AI-phrase hits and density after the rewrite
+    """
+    n = len(originals)
+    if n == 0:
+        return []
+    metrics = compute_style_metrics(list(originals) + list(rewrites))
+    before = slice(0, n)
+    after = slice(n, 2 * n)
+    # Drift uses whitespace-separated tokens, like the ±15% length check in the humanizer
+    drift = word_count_drift([len(text.split()) for text in originals], [len(text.split()) for text in rewrites])
+    return [
+        {
+            "reading_ease": round(float(ease), 1),
+            "input_reading_ease": round(float(input_ease), 1),
+            "sentence_length_variance": round(float(variance), 2),
+            "word_count_drift": round(float(change), 4),
+            "ai_phrase_hits": int(hits),
+            "input_ai_phrase_hits": int(input_hits),
+            "ai_phrase_density": round(float(density), 2),
+        }
+        for ease, input_ease, variance, change, hits, input_hits, density in zip(
+            metrics.reading_ease[after], metrics.reading_ease[before], metrics.sentence_length_variance[after],
+            drift, metrics.ai_phrase_hits[after], metrics.ai_phrase_hits[before], metrics.ai_phrase_density[after],
+        )
+    ]
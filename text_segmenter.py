@@ -0,0 +1,120 @@
+import re
+from typing import List, NamedTuple, Optional
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# Sentence boundary: end punctuation followed by whitespace and an uppercase letter or quote
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=["\'“‘(\[]?[A-Z])')
+_WORD = re.compile(r'\S+')
+
+
+class Span(NamedTuple):
+    start: int
+    end: int
+    words: int
+
+    @property
+    def chars(self) -> int:
+        return self.end - self.start
+
+
+class SegmentedText:
+    """
+    A text segmented once into paragraph spans, with sentence spans on demand.
+
+    Each paragraph (and each sentence of a paragraph that is split) is
+    counted exactly once when its span is built, and sentence boundaries
+    are scanned in place without copying the paragraph. Segmenting and
+    packing a document is therefore linear in its length; the chunks being
+    packed are never re-split or re-counted.
+    """
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text: Text to segment (spans index into this exact string)
+        """
+        self.text = text
+        self.paragraphs = self._find_paragraphs()
+        self.total_words = sum(paragraph.words for paragraph in self.paragraphs)
+
+    def span(self, start: int, end: int) -> Span:
+        """Build a Span for text[start:end] with its word count."""
+        return Span(start, end, len(self.text[start:end].split()))
+
+    def slice(self, span: Span) -> str:
+        """Return the text covered by a span."""
+        return self.text[span.start:span.end]
+
+    def _stripped_span(self, start: int, end: int) -> Optional[Span]:
+        # Span of text[start:end] without leading and trailing whitespace (None if blank)
+        segment = self.text[start:end]
+        stripped = segment.strip()
+        if not stripped:
+            return None
+        lead = len(segment) - len(segment.lstrip())
+        return Span(start + lead, start + lead + len(stripped), len(stripped.split()))
+
+    def _find_paragraphs(self) -> List[Span]:
+        # Split by blank lines first (most common paragraph separator) ...
+        breaks = [(m.start(), m.end()) for m in _PARAGRAPH_BREAK.finditer(self.text)]
+        # ... and fall back to single newlines when there are none
+        if not breaks:
+            breaks = [(m.start(), m.end()) for m in re.finditer(r'\n', self.text)]
+
+        paragraphs = []
+        position = 0
+        for break_start, break_end in breaks + [(len(self.text), len(self.text))]:
+            paragraph = self._stripped_span(position, break_start)
+            if paragraph:
+                paragraphs.append(paragraph)
+            position = break_end
+        return paragraphs
+
+    def sentences(self, paragraph: Span) -> List[Span]:
+        """
+        Split a paragraph span into sentence spans.
+
+        Args:
+            paragraph: Span of one paragraph
+
+        Returns:
+            Sentence spans in order (the paragraph itself if it has no boundaries)
+        """
+        result = []
+        position = paragraph.start
+        for boundary in _SENTENCE_BOUNDARY.finditer(self.text, paragraph.start, paragraph.end):
+            result.append(self.span(position, boundary.start()))
+            position = boundary.end()
+        result.append(self.span(position, paragraph.end))
+        return result
+
+    def word_pieces(self, span: Span, max_words: int) -> List[Span]:
+        """
+        Split a span at word boundaries into pieces of at most max_words words.
+
+        Used for text without sentence or paragraph breaks that is still too
+        long for one call.
+
+        Args:
+            span: Span to split
+            max_words: Largest piece in words
+
+        Returns:
+            Piece spans in order (the span itself if it is short enough)
+        """
+        if span.words <= max_words:
+            return [span]
+        pieces = []
+        start = end = None
+        words = 0
+        for word in _WORD.finditer(self.text, span.start, span.end):
+            if words == max_words:
+                pieces.append(Span(start, end, words))
+                start, words = None, 0
+            if start is None:
+                start = word.start()
+            end = word.end()
+            words += 1
+        if words:
+            pieces.append(Span(start, end, words))
+        return pieces